@@ -0,0 +1,130 @@
+"""Stress test: several client processes writing one database at once.
+
+Each client opens its own connection, as separate GUI instances or server
+workers would, and runs a mix of operations for a fixed time:
+
+    python benchmarks/concurrent_clients.py [--clients 8] [--seconds 10]
+
+Mix:  section saves (a course section graded in one commit), single-grade
+      saves, registration saves and CGPA reads
+Reports operations per second per kind and every "database is locked" or
+other error a client saw. With write_transaction() the error count should be
+zero; --deferred runs the writes in plain "with db:" transactions instead
+for comparison.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scholarsync import (  # noqa: E402
+    compute_cgpa, connect, save_grade_batch, save_registration,
+)
+
+SECTION_SIZE = 60
+LETTER_POINTS = [10.0, 9.0, 8.0, 7.0, 6.0, 5.0, 4.0, 0.0]
+# Relative weight of each operation in the mix
+MIX = {"section save": 1, "grade save": 4, "registration": 3, "cgpa read": 12}
+
+
+def setup(path, students, courses, profile):
+    rnd = random.Random(0)
+    db = connect(path, profile)
+    with db:
+        db.executemany("INSERT INTO Student (student_id, name, email) VALUES (?, ?, ?)",
+                       [(i, f"Student {i}", f"student{i}@university.edu") for i in range(1, students + 1)])
+        db.executemany("INSERT INTO Course (course_id, course_name, credits) VALUES (?, ?, ?)",
+                       [(i, f"Course {i}", rnd.randint(1, 4)) for i in range(1, courses + 1)])
+    db.close()
+
+def deferred_grade_batch(db, rows):
+    # The pre-write_transaction form, for --deferred
+    with db:
+        db.executemany("""
+            INSERT INTO Grade (student_id, course_id, semester, grade_point) VALUES (?, ?, ?, ?)
+            ON CONFLICT (course_id, semester, student_id) DO UPDATE SET grade_point = excluded.grade_point
+        """, rows)
+
+def deferred_registration(db, student_id, semester, course_ids):
+    with db:
+        db.execute("DELETE FROM Registration WHERE student_id = ? AND semester = ?", (student_id, semester))
+        db.executemany("INSERT INTO Registration (student_id, course_id, semester, registered_at) "
+                       "VALUES (?, ?, ?, datetime('now'))",
+                       [(student_id, course_id, semester) for course_id in course_ids])
+
+def client(args):
+    path, seed, students, courses, seconds, profile, deferred, start_at = args
+    rnd = random.Random(seed)
+    save_grades = deferred_grade_batch if deferred else save_grade_batch
+    register = deferred_registration if deferred else save_registration
+    db = connect(path, profile)
+    done, errors = Counter(), Counter()
+    kinds, weights = list(MIX), list(MIX.values())
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+    end = start_at + seconds
+    while time.time() < end:
+        kind = rnd.choices(kinds, weights)[0]
+        semester = rnd.randint(1, 4)
+        try:
+            if kind == "section save":
+                course_id = rnd.randint(1, courses)
+                save_grades(db, [(student_id, course_id, semester, rnd.choice(LETTER_POINTS))
+                                 for student_id in rnd.sample(range(1, students + 1), SECTION_SIZE)])
+            elif kind == "grade save":
+                save_grades(db, [(rnd.randint(1, students), rnd.randint(1, courses), semester,
+                                  rnd.choice(LETTER_POINTS))])
+            elif kind == "registration":
+                register(db, rnd.randint(1, students), semester, rnd.sample(range(1, courses + 1), 5))
+            else:
+                compute_cgpa(db, rnd.randint(1, students))
+            done[kind] += 1
+        except Exception as e:
+            if db.in_transaction:
+                db.rollback()
+            errors[f"{kind}: {e}"] += 1
+    db.close()
+    return done, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--profile", default="safe")
+    parser.add_argument("--deferred", action="store_true",
+                        help="write with plain deferred transactions instead of write_transaction()")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stress.db")
+        setup(path, args.students, args.courses, args.profile)
+        start_at = time.time() + 1.0
+        jobs = [(path, seed, args.students, args.courses, args.seconds, args.profile, args.deferred, start_at)
+                for seed in range(args.clients)]
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(client, jobs)
+
+    done, errors = Counter(), Counter()
+    for client_done, client_errors in results:
+        done.update(client_done)
+        errors.update(client_errors)
+    mode = "deferred" if args.deferred else "write_transaction"
+    print(f"{args.clients} clients, {args.seconds:g}s, profile {args.profile}, {mode}")
+    for kind in MIX:
+        print(f"  {kind:14}{done[kind]:>9,} ops {done[kind] / args.seconds:>9,.0f}/s")
+    print(f"  {'total':14}{sum(done.values()):>9,} ops {sum(done.values()) / args.seconds:>9,.0f}/s")
+    print(f"  errors        {sum(errors.values()):>9,}")
+    for message, count in errors.most_common(5):
+        print(f"    {count:>6} x {message}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Write and read throughput of each connection profile on the grade workload.
+
+SQLite's defaults are measured as a baseline. Every profile gets a fresh
+database in a temporary directory:
+
+    python benchmarks/connection_profiles.py [--students 5000] [--courses 100]
+
+Writes:  section saves (300 grades per commit) and single-grade saves (one
+         commit per grade, which is where synchronous=FULL pays an fsync)
+Reads:   single-student CGPA, grade reports and the cohort ranking
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scholarsync import (  # noqa: E402
+    PROFILES, compute_cgpa, connect, fetch_student_grades, rank_cohort, save_grade_batch,
+)
+
+SECTION_SIZE = 300
+LETTER_POINTS = [10.0, 9.0, 8.0, 7.0, 6.0, 5.0, 4.0, 0.0]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def run_profile(profile, students, courses, semesters, seed):
+    rnd = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db = connect(os.path.join(directory, "bench.db"), profile)
+        with db:
+            db.executemany("INSERT INTO Student (student_id, name, email) VALUES (?, ?, ?)",
+                           [(i, f"Student {i}", f"student{i}@university.edu") for i in range(1, students + 1)])
+            db.executemany("INSERT INTO Course (course_id, course_name, credits) VALUES (?, ?, ?)",
+                           [(i, f"Course {i}", rnd.randint(1, 4)) for i in range(1, courses + 1)])
+
+        # Section saves: each course section graded in one commit
+        sections = []
+        for semester in range(1, semesters + 1):
+            for course_id in range(1, courses + 1):
+                roster = rnd.sample(range(1, students + 1), min(SECTION_SIZE, students))
+                sections.append([(student_id, course_id, semester, rnd.choice(LETTER_POINTS)) for student_id in roster])
+        section_time = timed(lambda: [save_grade_batch(db, section) for section in sections])
+        section_grades = sum(len(section) for section in sections)
+
+        # Single-grade saves: one commit per grade
+        singles = [(rnd.randint(1, students), rnd.randint(1, courses), semesters + 1, rnd.choice(LETTER_POINTS))
+                   for _ in range(500)]
+        single_time = timed(lambda: [save_grade_batch(db, [row]) for row in singles])
+
+        lookups = [rnd.randint(1, students) for _ in range(2000)]
+        cgpa_time = timed(lambda: [compute_cgpa(db, student_id) for student_id in lookups])
+        report_time = timed(lambda: [fetch_student_grades(db, student_id) for student_id in lookups])
+        rank_time = timed(lambda: rank_cohort(db))
+        db.close()
+
+    return {
+        "section grades/s": section_grades / section_time,
+        "single commits/s": len(singles) / single_time,
+        "cgpa lookups/s": len(lookups) / cgpa_time,
+        "grade reports/s": len(lookups) / report_time,
+        "cohort rank (s)": rank_time,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--semesters", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # SQLite's own defaults (rollback journal, synchronous=FULL) as the baseline
+    candidates = {"defaults": {}, **PROFILES}
+    results = {name: run_profile(profile, args.students, args.courses, args.semesters, args.seed)
+               for name, profile in candidates.items()}
+    metrics = list(next(iter(results.values())))
+    print(f"{'':18}" + "".join(f"{profile:>14}" for profile in results))
+    for metric in metrics:
+        cells = "".join(f"{values[metric]:>14.2f}" if metric.endswith("(s)") else f"{values[metric]:>14,.0f}"
+                        for values in results.values())
+        print(f"{metric:18}{cells}")
+
+if __name__ == "__main__":
+    main()
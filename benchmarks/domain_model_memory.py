@@ -0,0 +1,59 @@
+"""Memory footprint of one student record in each representation.
+
+Builds the same students as tuples, dicts, named tuples, plain objects and
+the __slots__ model.Student, and reports what tracemalloc counts for each.
+The strings are created once and shared, so only the per-record container
+is measured:
+
+    python benchmarks/domain_model_memory.py [--students 100000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scholarsync import Student, StudentRecord  # noqa: E402
+
+
+class PlainStudent:
+    def __init__(self, student_id, name, email, program=None):
+        self.student_id = student_id
+        self.name = name
+        self.email = email
+        self.program = program
+
+REPRESENTATIONS = {
+    # A fresh copy of each row, so the tuples themselves are counted
+    "tuple": lambda row: tuple(list(row)),
+    "dict": lambda row: {"student_id": row[0], "name": row[1], "email": row[2], "program": row[3]},
+    "namedtuple": StudentRecord._make,
+    "plain object": lambda row: PlainStudent(*row),
+    "__slots__": lambda row: Student(*row),
+}
+
+
+def measure(make, rows):
+    tracemalloc.start()
+    records = [make(row) for row in rows]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    rows = [(i, f"Student {i}", f"student{i}@university.edu", None) for i in range(1, args.students + 1)]
+    label = f"{args.students:,} students"
+    print(f"{label:26}{'total':>12}{'per record':>12}{'vs __slots__':>14}")
+    results = {name: measure(make, rows) for name, make in REPRESENTATIONS.items()}
+    baseline = results["__slots__"]
+    for name, size in results.items():
+        print(f"{name:26}{size / 2**20:>8.1f} MiB{size / args.students:>10.0f} B{size / baseline:>13.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,47 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import sqlite3
 from datetime import datetime
+import bisect
+import argparse
 import os
+import subprocess
+import sys
+import threading
+
+from scholarsync import (
+    GRADE_POINTS, GRADE_LETTERS, parse_semester, migrate_registration_files, ChangeTracker,
+    format_registration, LocalBackend, RemoteBackend, Session, dump_query_stats,
+)
 # -----------------------------
 # Database Setup using SQLite
 # -----------------------------
-conn = sqlite3.connect("student_grades.db")
-cursor = conn.cursor()
+# The schema, grade math and reports live in the scholarsync package; this
+# module is only the Tk front end on top of it. It talks to a backend: the
+# local database file, or a ScholarSync server with --server URL (see
+# scholarsync.server).
+DB_PATH = "student_grades.db"
+DB_PROFILE = "safe"  # See scholarsync.database.PROFILES
+
+arg_parser = argparse.ArgumentParser(description="ScholarSync")
+arg_parser.add_argument("--server", default=os.environ.get("SCHOLARSYNC_SERVER"),
+                        help="use a ScholarSync server instead of the local database (default: $SCHOLARSYNC_SERVER)")
+arg_parser.add_argument("--token", default=os.environ.get("SCHOLARSYNC_TOKEN"))
+cli_args = arg_parser.parse_args()
+
+if cli_args.server:
+    backend = RemoteBackend(cli_args.server, cli_args.token)
+else:
+    # Slow reads run on a background thread with its own connection. Both
+    # connections time their queries for the Diagnostics tab. Writes made on
+    # the Tk thread give up on another workstation's lock after about a
+    # second rather than freezing the window.
+    backend = LocalBackend(DB_PATH, DB_PROFILE, timed=True, interactive=True)
+    # Old registration_{id}.txt files next to the app are imported once
+    migrate_registration_files(backend.db)
+
+# One Student/Course instance per id, shared by every tab
+session = Session(backend)
 
 # Define color palette
 # Color scheme based on the blue-grey-white reference
@@ -18,29 +52,6 @@ TEXT_COLOR = "#333333"
 ACCENT_COLOR = "#f8f9fa"  # Very light grey for section backgrounds
 WHITE = "#ffffff"
 
-
-
-def init_db():
-    cursor.execute('''CREATE TABLE IF NOT EXISTS Student (
-                        student_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        email TEXT UNIQUE NOT NULL)''')
-    cursor.execute('''CREATE TABLE IF NOT EXISTS Course (
-                        course_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        course_name TEXT NOT NULL UNIQUE,
-                        credits INTEGER NOT NULL)''')
-    cursor.execute('''CREATE TABLE IF NOT EXISTS Grade (
-                        grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        student_id INTEGER NOT NULL,
-                        course_id INTEGER NOT NULL,
-                        semester INTEGER NOT NULL,
-                        grade_point REAL NOT NULL,
-                        FOREIGN KEY (student_id) REFERENCES Student(student_id),
-                        FOREIGN KEY (course_id) REFERENCES Course(course_id))''')
-    conn.commit()
-
-init_db()
-
 # -----------------------------
 # Tkinter GUI Application
 # -----------------------------
@@ -48,9 +59,81 @@ root = tk.Tk()
 root.title("ScholarSync")
 root.geometry("900x600")
 
+def report_callback_error(exc_type, exc, tb):
+    # A database error a handler does not catch itself, e.g. a write that gave
+    # up waiting for another workstation's lock, is shown rather than printed
+    if isinstance(exc, sqlite3.Error):
+        messagebox.showerror("Database Error", f"The operation failed: {exc}")
+    else:
+        tk.Tk.report_callback_exception(root, exc_type, exc, tb)
+
+root.report_callback_exception = report_callback_error
+
+# Busy indicator shown while background database jobs are running
+status_bar = ttk.Frame(root)
+status_bar.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+busy_label = ttk.Label(status_bar, text="")
+busy_label.pack(side="left")
+busy_progress = ttk.Progressbar(status_bar, mode="indeterminate", length=120)
+running_jobs = [0]
+
+def set_busy(delta):
+    running_jobs[0] += delta
+    if running_jobs[0] > 0:
+        busy_label.config(text="Working...")
+        if not busy_progress.winfo_ismapped():
+            busy_progress.pack(side="left", padx=10)
+            busy_progress.start(10)
+        root.config(cursor="watch")
+    else:
+        busy_label.config(text="")
+        busy_progress.stop()
+        busy_progress.pack_forget()
+        root.config(cursor="")
+
+def run_in_background(op, *args, on_done=None):
+    # Runs a backend operation off the Tk thread and hands the result to
+    # on_done on it (results are polled with root.after)
+    future = backend.submit(op, *args)
+    set_busy(1)
+
+    def poll():
+        if not future.done():
+            root.after(25, poll)
+            return
+        set_busy(-1)
+        try:
+            result = future.result()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Background query failed: {e}")
+            return
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if on_done is not None:
+            on_done(result)
+
+    root.after(25, poll)
+    return future
+
 notebook = ttk.Notebook(root)
 notebook.pack(fill="both", expand=True, padx=10, pady=10)
 
+# Tabs load their data the first time they are selected rather than at
+# startup, so the window appears without waiting on any table scan. After
+# that each tab keeps its rows and is only reloaded by its own refreshes.
+tab_loaders = {}
+
+def load_on_first_select(frame, loader):
+    tab_loaders[str(frame)] = loader
+
+def on_tab_changed(event=None):
+    loader = tab_loaders.pop(notebook.select(), None)
+    if loader is not None:
+        loader()
+
+notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
 # Create a notebook (tabbed interface)
 style = ttk.Style()
 style.configure("TNotebook", background=BACKGROUND_COLOR)
@@ -59,6 +142,181 @@ style.configure("TFrame", background=BACKGROUND_COLOR)
 style.configure("TLabelframe", background=BACKGROUND_COLOR)
 style.configure("TLabelframe.Label", background=BACKGROUND_COLOR, foreground=PRIMARY_COLOR, font=("Arial", 11, "bold"))
 style.configure("TButton", background=PRIMARY_COLOR, foreground=WHITE, font=("Arial", 10), padx=10, pady=10)
+
+# -------------
+# Paged Treeview
+# -------------
+# Large tables are never loaded in full. A PagedTree keeps a window of at most
+# page_size * max_pages rows in the Treeview and slides it with keyset
+# pagination on the first column (the primary key) as the user scrolls.
+# Item ids are the key values, so the window edges double as keyset cursors.
+
+class PagedTree:
+    def __init__(self, tree, scrollbar, tree_name, page_size=200, max_pages=3, format_row=None):
+        # tree_name is one of scholarsync.records.TREE_QUERIES; rows come
+        # from the backend with the key first. format_row(row) returns the
+        # (values, tags) to show for a row; by default the row as it is.
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.tree_name = tree_name
+        self.format_row = format_row or (lambda row: (row, ()))
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+        self.at_start = True
+        self.at_end = True
+        self.loading = False
+        tree.configure(yscrollcommand=self.on_scroll)
+
+    def fetch(self, after=None, before=None):
+        return backend.fetch_tree_page(self.tree_name, after, before, self.page_size)
+
+    def insert(self, index, row):
+        values, tags = self.format_row(row)
+        self.tree.insert("", index, iid=str(row[0]), values=values, tags=tags)
+
+    def reset(self):
+        # Reload the first page; called by the refresh_*_tree functions
+        self.loading = True
+        try:
+            self.tree.delete(*self.tree.get_children())
+            rows = self.fetch()
+            for row in rows:
+                self.insert("end", row)
+            self.at_start = True
+            self.at_end = len(rows) < self.page_size
+            self.tree.yview_moveto(0)
+        finally:
+            self.loading = False
+
+    def show_rows(self, rows):
+        # Replace the window with a fixed set of rows (search results) that
+        # scrolling does not page away from until the next reset
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.insert("end", row)
+        self.at_start = self.at_end = True
+        self.tree.yview_moveto(0)
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.loading:
+            return
+        if float(last) > 0.9 and not self.at_end:
+            self.tree.after_idle(self.load_next)
+        elif float(first) < 0.1 and not self.at_start:
+            self.tree.after_idle(self.load_previous)
+
+    def top_index(self, count):
+        return round(float(self.tree.yview()[0]) * count)
+
+    def load_next(self):
+        items = self.tree.get_children()
+        if self.loading or self.at_end or not items:
+            return
+        self.loading = True
+        try:
+            top = self.top_index(len(items))
+            rows = self.fetch(after=items[-1])
+            for row in rows:
+                self.insert("end", row)
+            self.at_end = len(rows) < self.page_size
+
+            # Drop rows from the top to keep the window bounded
+            items = self.tree.get_children()
+            overflow = len(items) - self.max_rows
+            if overflow > 0:
+                self.tree.delete(*items[:overflow])
+                self.at_start = False
+                top -= overflow
+            self.tree.yview_moveto(max(top, 0) / max(len(self.tree.get_children()), 1))
+        finally:
+            self.loading = False
+
+    def load_previous(self):
+        items = self.tree.get_children()
+        if self.loading or self.at_start or not items:
+            return
+        self.loading = True
+        try:
+            top = self.top_index(len(items))
+            rows = self.fetch(before=items[0])
+            for index, row in enumerate(rows):
+                self.insert(index, row)
+            self.at_start = len(rows) < self.page_size
+            top += len(rows)
+
+            # Drop rows from the bottom to keep the window bounded
+            items = self.tree.get_children()
+            overflow = len(items) - self.max_rows
+            if overflow > 0:
+                self.tree.delete(*items[-overflow:])
+                self.at_end = False
+            self.tree.yview_moveto(top / max(len(self.tree.get_children()), 1))
+        finally:
+            self.loading = False
+
+    def fetch_one(self, key):
+        return backend.fetch_tree_row(self.tree_name, key)
+
+    def covers(self, key):
+        # Whether a row with this (integer) key belongs inside the loaded window
+        items = self.tree.get_children()
+        if not items:
+            return self.at_start and self.at_end
+        if key < int(items[0]):
+            return self.at_start
+        if key > int(items[-1]):
+            return self.at_end
+        return True
+
+    def apply_changes(self, changes):
+        # changes: {iid: "insert" | "update" | "delete"} from the ChangeTracker
+        for iid, kind in changes.items():
+            row = None if kind == "delete" else self.fetch_one(iid)
+            if row is None:
+                if self.tree.exists(iid):
+                    self.tree.delete(iid)
+            elif self.tree.exists(iid):
+                values, tags = self.format_row(row)
+                self.tree.item(iid, values=values, tags=tags)
+            elif self.covers(row[0]):
+                keys = [int(item) for item in self.tree.get_children()]
+                self.insert(bisect.bisect(keys, row[0]), row)
+
+
+change_tracker = ChangeTracker()
+
+def refresh_paged_tree(pager, table):
+    # Apply pending changes if there are any, otherwise reload the first page
+    changes = change_tracker.take(table)
+    if changes:
+        pager.apply_changes(changes)
+    else:
+        pager.reset()
+
+# Roster import errors listed in the summary dialog (the rest are counted)
+ROSTER_ERRORS_SHOWN = 15
+
+def import_roster_csv(kind, refresh_tree):
+    # Bulk import of a CSV roster on the database worker, in one transaction
+    path = filedialog.askopenfilename(title=f"Import {kind.title()}",
+                                      filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if not path:
+        return
+
+    def show_result(result):
+        refresh_tree()
+        message = f"{result.inserted} {kind} imported."
+        if not result.errors:
+            messagebox.showinfo("Import Complete", message)
+            return
+        lines = [f"Line {line_number}: {error}" for line_number, error in result.errors[:ROSTER_ERRORS_SHOWN]]
+        if len(result.errors) > ROSTER_ERRORS_SHOWN:
+            lines.append(f"... and {len(result.errors) - ROSTER_ERRORS_SHOWN} more")
+        messagebox.showwarning("Import Complete",
+                               f"{message}\n{len(result.errors)} row(s) were skipped:\n\n" + "\n".join(lines))
+
+    run_in_background("import_roster", path, kind, on_done=show_result)
 # -------------
 # Student Tab
 # -------------
@@ -93,16 +351,14 @@ student_tree.column("Email", width=250)
 
 # Add a scrollbar
 scrollbar = ttk.Scrollbar(student_tree_frame, orient="vertical", command=student_tree.yview)
-student_tree.configure(yscrollcommand=scrollbar.set)
 scrollbar.pack(side="right", fill="y")
 student_tree.pack(side="left", fill="both", expand=True)
 
+# Only a window of students is loaded at a time
+student_pager = PagedTree(student_tree, scrollbar, "students")
+
 def refresh_student_tree():
-    for row in student_tree.get_children():
-        student_tree.delete(row)
-    cursor.execute("SELECT * FROM Student")
-    for row in cursor.fetchall():
-        student_tree.insert("", "end", values=row)
+    refresh_paged_tree(student_pager, "Student")
 
 def add_student():
     popup = tk.Toplevel(root)
@@ -133,9 +389,8 @@ def add_student():
         email = email_entry.get()
         if name and email:
             try:
-                cursor.execute("INSERT INTO Student (name, email) VALUES (?, ?)", 
-                               (name, email))
-                conn.commit()
+                student_id = backend.add_student(name, email)
+                change_tracker.record("Student", student_id, "insert")
                 refresh_student_tree()
                 popup.destroy()
             except sqlite3.IntegrityError as e:
@@ -154,13 +409,23 @@ def add_student():
     cancel_button = tk.Button(button_frame, text="Cancel", command=popup.destroy,bg="#f44336", fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=10)
     cancel_button.pack(side="left", padx=5)
 
+def selected_student(tree):
+    # The Student of the selected row (the row ids are student ids), shared
+    # through the session; None with a warning if it has been deleted since
+    student = session.student(tree.focus())
+    if student is None:
+        messagebox.showwarning("Student Not Found", "That student no longer exists. Please refresh the list.")
+    return student
+
 def update_student():
     selected = student_tree.focus()
     if not selected:
         messagebox.showwarning("Select Student", "Please select a student to update.")
         return
-    record = student_tree.item(selected, "values")
-    student_id = record[0]
+    student = selected_student(student_tree)
+    if student is None:
+        return
+    student_id = student.student_id
     
     popup = tk.Toplevel(root)
     popup.title("Update Student")
@@ -179,12 +444,12 @@ def update_student():
     
     ttk.Label(form_frame, text="Name:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
     name_entry = ttk.Entry(form_frame, width=25)
-    name_entry.insert(0, record[1])
+    name_entry.insert(0, student.name)
     name_entry.grid(row=0, column=1, padx=5, pady=5)
 
     ttk.Label(form_frame, text="Email:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
     email_entry = ttk.Entry(form_frame, width=25)
-    email_entry.insert(0, record[2])
+    email_entry.insert(0, student.email)
     email_entry.grid(row=1, column=1, padx=5, pady=5)
 
     def submit():
@@ -192,9 +457,8 @@ def update_student():
         email = email_entry.get()
         if name and email:
             try:
-                cursor.execute("UPDATE Student SET name=?, email=? WHERE student_id=?",
-                               (name, email, student_id))
-                conn.commit()
+                session.update_student(student_id, name, email)
+                change_tracker.record("Student", student_id, "update")
                 refresh_student_tree()
                 popup.destroy()
             except sqlite3.IntegrityError as e:
@@ -218,11 +482,18 @@ def delete_student():
     if not selected:
         messagebox.showwarning("Select Student", "Please select a student to delete.")
         return
-    record = student_tree.item(selected, "values")
-    student_id = record[0]
-    if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete student '{record[1]}'?"):
-        cursor.execute("DELETE FROM Student WHERE student_id=?", (student_id,))
-        conn.commit()
+    student = selected_student(student_tree)
+    if student is None:
+        return
+    student_id = student.student_id
+    if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete student '{student.name}'?"):
+        try:
+            session.delete_student(student_id)
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", f"Could not delete student '{student.name}': "
+                                          "grades or registrations still refer to them.")
+            return
+        change_tracker.record("Student", student_id, "delete")
         refresh_student_tree()
 
 # Buttons for Student Tab with styling
@@ -243,11 +514,14 @@ update_button.pack(side="left", padx=5)
 delete_button = tk.Button(student_button_frame, text="Delete Student", command=delete_student, bg="#f44336", fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=15)
 delete_button.pack(side="left", padx=5)
 
+import_button = tk.Button(student_button_frame, text="Import CSV", command=lambda: import_roster_csv("students", refresh_student_tree), bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=15)
+import_button.pack(side="left", padx=5)
+
 refresh_button = tk.Button(student_button_frame, text="Refresh", command=refresh_student_tree, bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=10)
 refresh_button.pack(side="right", padx=5)
 
-# Initialize the student list
-refresh_student_tree()
+# Load the student list when the tab is first shown
+load_on_first_select(student_frame, refresh_student_tree)
 
 # -------------
 # Course Tab
@@ -282,22 +556,17 @@ course_tree.column("Professor", width=180)
 
 # Add a scrollbar
 scrollbar = ttk.Scrollbar(course_tree_frame, orient="vertical", command=course_tree.yview)
-course_tree.configure(yscrollcommand=scrollbar.set)
 scrollbar.pack(side="right", fill="y")
 course_tree.pack(side="left", fill="both", expand=True)
 
+# Only a window of courses is loaded at a time
+course_pager = PagedTree(course_tree, scrollbar, "courses")
+
 def refresh_course_tree():
-    for row in course_tree.get_children():
-        course_tree.delete(row)
-    cursor.execute("""
-        SELECT c.course_id, c.course_name, c.credits, 
-               IFNULL(p.last_name || ', ' || p.first_name, 'Not Assigned') as professor_name
-        FROM Course c
-        LEFT JOIN CourseAssignment ca ON c.course_id = ca.course_id
-        LEFT JOIN Professor p ON ca.professor_id = p.professor_id
-    """)
-    for row in cursor.fetchall():
-        course_tree.insert("", "end", values=row)
+    # Every course write and import ends here, so the session's course list
+    # is reloaded on its next use
+    session.forget_courses()
+    refresh_paged_tree(course_pager, "Course")
 
 def add_course():
     popup = tk.Toplevel(root)
@@ -326,8 +595,7 @@ def add_course():
     ttk.Label(form_frame, text="Professor:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
     
     # Get all professors for dropdown
-    cursor.execute("SELECT professor_id, first_name || ' ' || last_name as full_name FROM Professor ORDER BY last_name, first_name")
-    professors = [("", "-- Select Professor --")] + [(str(row[0]), row[1]) for row in cursor.fetchall()]
+    professors = [("", "-- Select Professor --")] + [(str(row[0]), row[1]) for row in backend.list_professors()]
     
     professor_var = tk.StringVar()
     professor_dropdown = ttk.Combobox(form_frame, textvariable=professor_var, state="readonly", width=23)
@@ -342,18 +610,10 @@ def add_course():
         
         if course_name and credits:
             try:
-                # First, insert the course
-                cursor.execute("INSERT INTO Course (course_name, credits) VALUES (?, ?)", 
-                               (course_name, int(credits)))
-                course_id = cursor.lastrowid
-                
-                # Then, if a professor was selected, create the assignment
-                if selected_prof_index > 0:  # Skip the "-- Select Professor --" option
-                    professor_id = professors[selected_prof_index][0]
-                    cursor.execute("INSERT INTO CourseAssignment (course_id, professor_id) VALUES (?, ?)",
-                                  (course_id, professor_id))
-                
-                conn.commit()
+                # Insert the course and, if a professor was selected, its assignment
+                professor_id = professors[selected_prof_index][0] if selected_prof_index > 0 else None
+                course_id = backend.add_course(course_name, int(credits), professor_id)
+                change_tracker.record("Course", course_id, "insert")
                 refresh_course_tree()
                 popup.destroy()
             except sqlite3.IntegrityError as e:
@@ -409,23 +669,15 @@ def update_course():
     
     ttk.Label(form_frame, text="Professor:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
     
-    # Get all professors for dropdown
-    cursor.execute("SELECT professor_id, first_name || ' ' || last_name as full_name FROM Professor ORDER BY last_name, first_name")
-    professors = [("", "-- Select Professor --")] + [(str(row[0]), row[1]) for row in cursor.fetchall()]
+    # All professors for the dropdown and the course's current one, in one
+    # round trip when the backend is a server
+    professor_rows, current_prof = backend.batch([("list_professors",), ("course_professor", course_id)])
+    professors = [("", "-- Select Professor --")] + [(str(row[0]), row[1]) for row in professor_rows]
     
     professor_var = tk.StringVar()
     professor_dropdown = ttk.Combobox(form_frame, textvariable=professor_var, state="readonly", width=23)
     professor_dropdown['values'] = [prof[1] for prof in professors]
     
-    # Get current professor for this course
-    cursor.execute("""
-        SELECT p.professor_id, p.first_name || ' ' || p.last_name as full_name
-        FROM Professor p
-        JOIN CourseAssignment ca ON p.professor_id = ca.professor_id
-        WHERE ca.course_id = ?
-    """, (course_id,))
-    current_prof = cursor.fetchone()
-    
     # Set current selection in dropdown
     if current_prof:
         for i, prof in enumerate(professors):
@@ -444,19 +696,10 @@ def update_course():
         
         if course_name and credits:
             try:
-                # First, update the course
-                cursor.execute("UPDATE Course SET course_name=?, credits=? WHERE course_id=?",
-                               (course_name, int(credits), course_id))
-                
-                # Then, update the professor assignment
-                cursor.execute("DELETE FROM CourseAssignment WHERE course_id=?", (course_id,))
-                
-                if selected_prof_index > 0:  # Skip the "-- Select Professor --" option
-                    professor_id = professors[selected_prof_index][0]
-                    cursor.execute("INSERT INTO CourseAssignment (course_id, professor_id) VALUES (?, ?)",
-                                  (course_id, professor_id))
-                
-                conn.commit()
+                # Update the course together with its professor assignment
+                professor_id = professors[selected_prof_index][0] if selected_prof_index > 0 else None
+                backend.update_course(course_id, course_name, int(credits), professor_id)
+                change_tracker.record("Course", course_id, "update")
                 refresh_course_tree()
                 popup.destroy()
             except sqlite3.IntegrityError as e:
@@ -485,10 +728,22 @@ def delete_course():
     record = course_tree.item(selected, "values")
     course_id = record[0]
     if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete course '{record[1]}'?"):
-        # Delete from CourseAssignment first due to foreign key constraints
-        cursor.execute("DELETE FROM CourseAssignment WHERE course_id=?", (course_id,))
-        cursor.execute("DELETE FROM Course WHERE course_id=?", (course_id,))
-        conn.commit()
+        try:
+            backend.delete_course(course_id)
+        except sqlite3.IntegrityError:
+            # Graded or registered for; deleting those records too needs its
+            # own confirmation
+            if not messagebox.askyesno("Course In Use", f"Grades or registrations still refer to course "
+                                                         f"'{record[1]}'. Delete them together with the course?"):
+                return
+            try:
+                backend.delete_course_with_records(course_id)
+            except sqlite3.Error as e:
+                messagebox.showerror("Error", f"Could not delete course '{record[1]}': {e}")
+                return
+            refresh_grade_status_tree()
+            refresh_registration_tree()
+        change_tracker.record("Course", course_id, "delete")
         refresh_course_tree()
 
 # Buttons for Course Tab with styling
@@ -509,11 +764,14 @@ update_button.pack(side="left", padx=5)
 delete_button = tk.Button(course_button_frame, text="Delete Course", command=delete_course,bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=15)
 delete_button.pack(side="left", padx=5)
 
+import_button = tk.Button(course_button_frame, text="Import CSV", command=lambda: import_roster_csv("courses", refresh_course_tree), bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=15)
+import_button.pack(side="left", padx=5)
+
 refresh_button = tk.Button(course_button_frame, text="Refresh", command=refresh_course_tree,bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=10)
 refresh_button.pack(side="right", padx=5)
 
-# Initialize the course list
-refresh_course_tree()
+# Load the course list when the tab is first shown
+load_on_first_select(course_frame, refresh_course_tree)
 
 # -------------
 # Professor Tab
@@ -543,20 +801,17 @@ professor_tree.heading("Email", text="Email")
 
 # Add scrollbar
 y_scrollbar = ttk.Scrollbar(professor_frame, orient="vertical", command=professor_tree.yview)
-professor_tree.configure(yscrollcommand=y_scrollbar.set)
 
 # Position treeview and scrollbar
 professor_tree.pack(fill="both", expand=True, padx=10, pady=10)
 y_scrollbar.place(relx=1.0, rely=0.0, relheight=0.9, anchor='ne')
 
 
-# Keep the original refresh function
+# Only a window of professors is loaded at a time
+professor_pager = PagedTree(professor_tree, y_scrollbar, "professors")
+
 def refresh_professor_tree():
-    for row in professor_tree.get_children():
-        professor_tree.delete(row)
-    cursor.execute("SELECT * FROM Professor")
-    for row in cursor.fetchall():
-        professor_tree.insert("", "end", values=row)
+    refresh_paged_tree(professor_pager, "Professor")
 
 # Modified popup styling for add_professor function
 def add_professor():
@@ -593,9 +848,8 @@ def add_professor():
         
         if first_name and last_name and department and email:
             try:
-                cursor.execute("INSERT INTO Professor (first_name, last_name, department, email) VALUES (?, ?, ?, ?)", 
-                               (first_name, last_name, department, email))
-                conn.commit()
+                professor_id = backend.add_professor(first_name, last_name, department, email)
+                change_tracker.record("Professor", professor_id, "insert")
                 refresh_professor_tree()
                 popup.destroy()
             except sqlite3.IntegrityError as e:
@@ -629,8 +883,7 @@ def delete_professor():
     prof_id = record[0]  # The first column is the professor ID
     
     # Check if professor is assigned to any courses
-    cursor.execute("SELECT COUNT(*) FROM CourseAssignment WHERE professor_id = ?", (prof_id,))
-    assigned_count = cursor.fetchone()[0]
+    assigned_count = len(backend.professor_courses(prof_id))
     
     if assigned_count > 0:
         # Professor has course assignments - ask for confirmation
@@ -639,37 +892,31 @@ def delete_professor():
                             f"Deleting will remove all assignments. Continue?",
                             icon='warning'):
             try:
-                # Delete the course assignments first (foreign key constraint)
-                cursor.execute("DELETE FROM CourseAssignment WHERE professor_id=?", (prof_id,))
-                
-                # Then delete the professor
-                cursor.execute("DELETE FROM Professor WHERE professor_id=?", (prof_id,))
-                
-                # Commit the changes to the database
-                conn.commit()
+                # Delete the professor with their course assignments,
+                # remembering which courses lose their professor
+                course_ids = backend.delete_professor(prof_id)
+                change_tracker.record("Professor", prof_id, "delete")
+                for course_id in course_ids:
+                    change_tracker.record("Course", course_id, "update")
                 
                 # Refresh the treeview to show the updated data
                 refresh_professor_tree()
                 
-                # Also refresh the course tree if it exists (to show professor removals)
-                if 'refresh_course_tree' in globals():
-                    refresh_course_tree()
+                # Also refresh the course tree (to show professor removals)
+                refresh_course_tree()
                     
                 messagebox.showinfo("Success", "Professor and associated course assignments deleted successfully.")
             except sqlite3.Error as e:
                 # Show error message if delete operation fails
                 messagebox.showerror("Database Error", f"Failed to delete professor: {e}")
-                conn.rollback()  # Roll back the transaction
     else:
         # Professor has no course assignments - simple confirmation
         if messagebox.askyesno("Confirm Delete", 
                              f"Are you sure you want to delete professor {record[1]} {record[2]}?"):
             try:
                 # Delete the professor
-                cursor.execute("DELETE FROM Professor WHERE professor_id=?", (prof_id,))
-                
-                # Commit the changes
-                conn.commit()
+                backend.delete_professor(prof_id)
+                change_tracker.record("Professor", prof_id, "delete")
                 
                 # Refresh the treeview
                 refresh_professor_tree()
@@ -678,7 +925,6 @@ def delete_professor():
             except sqlite3.Error as e:
                 # Show error message if delete operation fails
                 messagebox.showerror("Database Error", f"Failed to delete professor: {e}")
-                conn.rollback()  # Roll back the transaction
                 
 # Modified popup styling for update_professor function (similar changes)
 def update_professor():
@@ -726,10 +972,16 @@ def update_professor():
         
         if first_name and last_name and department and email:
             try:
-                cursor.execute("UPDATE Professor SET first_name=?, last_name=?, department=?, email=? WHERE professor_id=?",
-                               (first_name, last_name, department, email, prof_id))
-                conn.commit()
+                backend.update_professor(prof_id, first_name, last_name, department, email)
+                change_tracker.record("Professor", prof_id, "update")
                 refresh_professor_tree()
+
+                # Courses taught by this professor show the new name
+                course_ids = backend.professor_courses(prof_id)
+                if course_ids:
+                    for course_id in course_ids:
+                        change_tracker.record("Course", course_id, "update")
+                    refresh_course_tree()
                 popup.destroy()
             except sqlite3.IntegrityError as e:
                 messagebox.showerror("Error", f"Could not update professor: {e}")
@@ -768,8 +1020,11 @@ update_button.pack(side="left", padx=5)
 delete_button = tk.Button(professor_button_frame, text="Delete Professor", command=delete_professor, bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10)
 delete_button.pack(side="left", padx=5)
 
-# Initialize the view
-refresh_professor_tree() 
+import_button = tk.Button(professor_button_frame, text="Import CSV", command=lambda: import_roster_csv("professors", refresh_professor_tree), bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10)
+import_button.pack(side="left", padx=5)
+
+# Load the professor list when the tab is first shown
+load_on_first_select(professor_frame, refresh_professor_tree)
     
 # -------------
 # Grade Entry Tab
@@ -820,84 +1075,52 @@ scrollbar.config(command=grade_status_tree.yview)
 grade_status_tree.tag_configure("grades_entered", background="#e6ffe6")  # Light green
 grade_status_tree.tag_configure("no_grades", background="#fff9e6")       # Light yellow
 
-# Add this code to your database initialization section
-# (where you created the Professor and CourseAssignment tables)
+def format_grade_status(row):
+    # Colored by whether any grades are stored
+    student_id, name, graded = row
+    if graded:
+        return (student_id, name, "Grades Entered"), ("grades_entered",)
+    return (student_id, name, "No Grades"), ("no_grades",)
 
-# Create Student table if it doesn't exist
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS Student (
-    student_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT UNIQUE NOT NULL,
-    program TEXT NOT NULL
-)
-''')
-
-# Create Grade table for storing student grades if it doesn't exist
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS Grade (
-    grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    student_id INTEGER NOT NULL,
-    course_id INTEGER NOT NULL,
-    grade TEXT NOT NULL,
-    FOREIGN KEY (student_id) REFERENCES Student(student_id),
-    FOREIGN KEY (course_id) REFERENCES Course(course_id),
-    UNIQUE(student_id, course_id)
-)
-''')
-conn.commit()
+# Students are paged in like the other large trees
+grade_status_pager = PagedTree(grade_status_tree, scrollbar, "grade-status", format_row=format_grade_status)
 
-# Then modify your refresh_grade_status_tree function to handle the case 
-# where the table exists but might be empty
 def refresh_grade_status_tree():
-    # Clear existing items
-    for row in grade_status_tree.get_children():
-        grade_status_tree.delete(row)
-    
-    try:
-        # Check if the Student table exists first
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Student'")
-        if cursor.fetchone() is None:
-            messagebox.showwarning("Missing Table", "Student table doesn't exist. Creating it now.")
-            # Create the table if it doesn't exist
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Student (
-                student_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                program TEXT NOT NULL
-            )
-            ''')
-            conn.commit()
-            return  # Return early since the table will be empty
-            
-        # Fetch students
-        cursor.execute("SELECT student_id, name FROM Student")
-        students = cursor.fetchall()
-        
-        if not students:
-            # If no data, insert a sample student for testing
-            sample_data = [
-                ("John Doe", "john.doe@university.edu", "Computer Science"),
-                ("Jane Smith", "jane.smith@university.edu", "Mathematics")
-            ]
-            cursor.executemany("INSERT INTO Student (name, email, program) VALUES (?, ?, ?)", sample_data)
-            conn.commit()
-            
-            # Now fetch again
-            cursor.execute("SELECT student_id, name FROM Student")
-            students = cursor.fetchall()
-        
-        # Display in treeview
-        for student in students:
-            grade_status_tree.insert("", "end", values=student)
-            
-    except sqlite3.OperationalError as e:
-        messagebox.showerror("Database Error", f"Error accessing student data: {e}")
-
-# Search function
+    grade_status_pager.reset()
+
+def show_grade_status_rows(students):
+    grade_status_pager.show_rows(students)
+
+# Search function (server-side, debounced while typing)
+search_state = {"after_id": None, "generation": 0}
+
 def search_students():
-    refresh_grade_status_tree()
+    if search_state["after_id"] is not None:
+        root.after_cancel(search_state["after_id"])
+        search_state["after_id"] = None
+
+    # Results of an older search that finish late are dropped
+    search_state["generation"] += 1
+    generation = search_state["generation"]
+
+    text = search_var.get().strip()
+    if not text:
+        refresh_grade_status_tree()
+        return
+
+    def show_results(students):
+        if generation == search_state["generation"]:
+            show_grade_status_rows(students)
+
+    run_in_background("search_students_by_text", text, on_done=show_results)
+
+def on_search_changed(*args):
+    if search_state["after_id"] is not None:
+        root.after_cancel(search_state["after_id"])
+    search_state["after_id"] = root.after(250, search_students)
+
+search_var.trace_add("write", on_search_changed)
+search_entry.bind("<Return>", lambda event: search_students())
 
 # Add search button
 search_button = tk.Button(search_frame, text="Search", bg="#3b5998", fg="white",
@@ -908,7 +1131,7 @@ search_button.pack(side="left", padx=5)
 # Clear search button
 clear_button = tk.Button(search_frame, text="Clear", bg="#d3d3d3", fg="black",
                        font=("Arial", 10), padx=10, pady=2, bd=0,
-                       command=lambda: [search_var.set(""), refresh_grade_status_tree()])
+                       command=lambda: [search_var.set(""), search_students()])
 clear_button.pack(side="left", padx=5)
 
 def enter_grades():
@@ -918,33 +1141,18 @@ def enter_grades():
         messagebox.showwarning("Select Student", "Please select a student to enter grades for.")
         return
     
-    student_data = grade_status_tree.item(selected, "values")
-    student_id = student_data[0]
-    student_name = student_data[1]
+    student = selected_student(grade_status_tree)
+    if student is None:
+        return
+    student_id, student_name = student.student_id, student.name
     
-    # Check if student has registered for courses
-    registration_file = f"registration_{student_id}.txt"
-    if not os.path.exists(registration_file):
+    # Check if student has registered for courses (latest registered semester)
+    latest_semester, registered_courses = backend.latest_registration(student_id)
+    if latest_semester is None:
         messagebox.showinfo("No Registration", f"{student_name} has not registered for any courses.")
         return
-    
-    # Parse the registration file to get registered courses
-    registered_courses = []
-    current_semester = None
-    with open(registration_file, "r") as f:
-        lines = f.readlines()
-        for line in lines:
-            if line.startswith("Semester:"):
-                current_semester = line.split(":")[1].strip()
-            elif line.startswith("- "):
-                # Extract course ID from line like "- 101 - Introduction to Programming"
-                course_info = line.strip("- \n")
-                try:
-                    course_id = int(course_info.split(" - ")[0])
-                    registered_courses.append(course_id)
-                except (ValueError, IndexError):
-                    continue
-    
+    current_semester = str(latest_semester)
+
     if not registered_courses:
         messagebox.showinfo("No Courses", f"{student_name} has not registered for any courses.")
         return
@@ -1002,14 +1210,7 @@ def enter_grades():
     course_grades = {}
     any_courses_found = False
     
-    for course_id in registered_courses:
-        # Get course details
-        cursor.execute("SELECT course_name FROM Course WHERE course_id = ?", (course_id,))
-        result = cursor.fetchone()
-        if not result:
-            continue
-            
-        course_name = result[0]
+    for course_id, course_name in registered_courses:
         any_courses_found = True
         
         course_frame = ttk.Frame(scrollable_frame)
@@ -1041,77 +1242,15 @@ def enter_grades():
             messagebox.showwarning("No Grades", "Please enter at least one grade.")
             return
         
-        # Convert letter grades to points
-        grade_points = {
-            "AA": 10.0, "AB": 9.0,
-            "BB": 8.0, "BC": 7.0, "CC": 6.0,
-            "CD": 5.0, "DD": 4.0,
-            "FF": 0.0
-        }
-        
-        # Save grades to file
-        grade_file = f"grades_{student_id}.txt"
-        with open(grade_file, "w") as f:
-            f.write(f"Student ID: {student_id}\n")
-            f.write(f"Student Name: {student_name}\n")
-            f.write(f"Semester: {semester}\n")
-            f.write("Course Grades:\n")
-            
-            # Calculate GPA
-            total_points = 0
-            total_courses = 0
-            
-            for course_id, letter_grade in entered_grades.items():
-                # Get course name
-                cursor.execute("SELECT course_name FROM Course WHERE course_id = ?", (course_id,))
-                course_name = cursor.fetchone()[0]
-                
-                # Get grade point
-                grade_point = grade_points.get(letter_grade, 0)
-                
-                # Save to file
-                f.write(f"- {course_id} - {course_name}: {letter_grade} ({grade_point})\n")
-                
-                # Add to database
-                try:
-                # If the semester is just a number like "1", "2", etc.
-                    if semester.isdigit():
-                        semester_num = int(semester)
-                    
-                    else:
-                    # Extract digits from the string
-                        digits = ''.join(filter(str.isdigit, semester))
-                        semester_num = int(digits) if digits else 1  # Default to 1 if no digits found
-            
-                    cursor.execute("""
-                        INSERT INTO Grade (student_id, course_id, semester, grade_point) 
-                        VALUES (?, ?, ?, ?)
-                    """, (student_id, course_id, semester_num, grade_point))
-                    conn.commit()
-                except ValueError:
-                # If conversion fails, use a default value
-                    cursor.execute("""
-                        INSERT INTO Grade (student_id, course_id, semester, grade_point) 
-                        ALUES (?, ?, ?, ?)
-                    """, (student_id, course_id, 1, grade_point))  # Default to semester 1    
-                except Exception as e:
-                    # If grade already exists, update it
-                    cursor.execute("""
-                        UPDATE Grade SET grade_point = ? 
-                        WHERE student_id = ? AND course_id = ? AND semester = ?
-                    """, (grade_point, student_id, course_id, int(semester.split()[1])))
-                    conn.commit()
-                
-                total_points += grade_point
-                total_courses += 1
-            
-            # Calculate and save GPA
-            if total_courses > 0:
-                gpa = total_points / total_courses
-                f.write(f"\nSemester GPA: {gpa:.2f}\n")
-            
-            f.write(f"Date Entered: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        
+        # All grades go to the database in one transaction
+        semester_num = parse_semester(semester)
+        try:
+            backend.save_grade_batch([(student_id, course_id, semester_num, GRADE_POINTS.get(letter_grade, 0))
+                                    for course_id, letter_grade in entered_grades.items()])
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Could not save grades: {e}")
+            return
+
         messagebox.showinfo("Grades Saved", f"Grades for {student_name} have been saved.")
         refresh_grade_status_tree()
         popup.destroy()
@@ -1128,6 +1267,141 @@ def enter_grades():
                             font=("Arial", 10), padx=10, pady=2, bd=0, command=popup.destroy)
     cancel_button.pack(side="right", padx=5)
 
+def grade_course_section():
+    # Grade sheet for every student registered in one course and semester
+    courses = session.courses()
+    if not courses:
+        messagebox.showinfo("No Courses", "There are no courses to grade.")
+        return
+
+    popup = tk.Toplevel(root)
+    popup.title("Grade Course Section")
+    popup.geometry("600x550")
+    popup.configure(bg="#f0f0f0")
+    popup.grab_set()  # Make window modal
+
+    # Add blue header
+    popup_header = tk.Frame(popup, bg="#3b5998", padx=10, pady=10)
+    popup_header.pack(fill="x")
+    popup_title = tk.Label(popup_header, text="Grade Course Section",
+                         font=("Arial", 12, "bold"), bg="#3b5998", fg="white")
+    popup_title.pack()
+
+    # Course and semester selection
+    selection_frame = ttk.Frame(popup)
+    selection_frame.pack(fill="x", padx=10, pady=(10, 0))
+
+    ttk.Label(selection_frame, text="Course:").pack(side="left", padx=5)
+    course_combo = ttk.Combobox(selection_frame, width=30, state="readonly",
+                                values=[f"{course.course_id} - {course.course_name}" for course in courses])
+    course_combo.pack(side="left", padx=5)
+
+    ttk.Label(selection_frame, text="Semester:").pack(side="left", padx=5)
+    semester_combo = ttk.Combobox(selection_frame, width=5, state="readonly")
+    semester_combo.pack(side="left", padx=5)
+
+    # One row per registered student; grades are set on the selected rows
+    sheet_frame = ttk.Frame(popup)
+    sheet_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+    sheet_scrollbar = ttk.Scrollbar(sheet_frame)
+    sheet_scrollbar.pack(side="right", fill="y")
+
+    sheet_tree = ttk.Treeview(sheet_frame, columns=("ID", "Student", "Grade"), show="headings",
+                              yscrollcommand=sheet_scrollbar.set)
+    sheet_tree.heading("ID", text="ID")
+    sheet_tree.heading("Student", text="Student")
+    sheet_tree.heading("Grade", text="Grade")
+    sheet_tree.column("ID", width=80)
+    sheet_tree.column("Student", width=250)
+    sheet_tree.column("Grade", width=80, anchor="center")
+    sheet_tree.pack(side="left", fill="both", expand=True)
+    sheet_scrollbar.config(command=sheet_tree.yview)
+    sheet_tree.tag_configure("changed", background="#e6ffe6")  # Light green
+
+    grade_frame = ttk.Frame(popup)
+    grade_frame.pack(fill="x", padx=10)
+
+    ttk.Label(grade_frame, text="Grade for selected students:").pack(side="left", padx=5)
+    grade_var = tk.StringVar()
+    grade_combo = ttk.Combobox(grade_frame, textvariable=grade_var, width=5, state="readonly",
+                               values=["AA", "AB", "BB", "BC", "CC", "CD", "DD", "FF"])
+    grade_combo.pack(side="left", padx=5)
+
+    # The section on screen and the grades changed since it was loaded
+    section = {"course_id": None, "semester": None}
+    changed_grades = {}
+
+    def load_section(event=None):
+        sheet_tree.delete(*sheet_tree.get_children())
+        changed_grades.clear()
+        if not semester_combo.get():
+            return
+        section["course_id"] = courses[course_combo.current()].course_id
+        section["semester"] = int(semester_combo.get())
+
+        # Names and existing grades come from one query
+        for student_id, name, grade_point in backend.fetch_section_grades(section["course_id"], section["semester"]):
+            letter_grade = GRADE_LETTERS.get(grade_point, "") if grade_point is not None else ""
+            sheet_tree.insert("", "end", iid=str(student_id), values=(student_id, name, letter_grade))
+
+    def on_course_selected(event=None):
+        semesters = backend.course_semesters(courses[course_combo.current()].course_id)
+        semester_combo["values"] = [str(semester) for semester in semesters]
+        if semesters:
+            semester_combo.current(len(semesters) - 1)  # Latest semester
+        else:
+            semester_combo.set("")
+            messagebox.showinfo("No Registration", "No students have registered for this course.", parent=popup)
+        load_section()
+
+    course_combo.bind("<<ComboboxSelected>>", on_course_selected)
+    semester_combo.bind("<<ComboboxSelected>>", load_section)
+
+    def set_grade():
+        letter_grade = grade_var.get()
+        selected = sheet_tree.selection()
+        if not letter_grade or not selected:
+            messagebox.showwarning("Set Grade", "Select one or more students and a grade.", parent=popup)
+            return
+        for iid in selected:
+            sheet_tree.set(iid, "Grade", letter_grade)
+            sheet_tree.item(iid, tags=("changed",))
+            changed_grades[int(iid)] = letter_grade
+
+    set_button = tk.Button(grade_frame, text="Set Grade", bg="#3b5998", fg="white",
+                         font=("Arial", 10), padx=10, pady=2, bd=0, command=set_grade)
+    set_button.pack(side="left", padx=5)
+
+    def save_sheet():
+        if not changed_grades:
+            messagebox.showwarning("No Grades", "No grades have been changed.", parent=popup)
+            return
+
+        # The whole section is written with one executemany and one commit
+        try:
+            saved = backend.save_grade_batch([(student_id, section["course_id"], section["semester"], GRADE_POINTS[letter_grade])
+                                            for student_id, letter_grade in changed_grades.items()])
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Could not save grades: {e}", parent=popup)
+            return
+
+        messagebox.showinfo("Grades Saved", f"{saved} grade(s) have been saved.", parent=popup)
+        refresh_grade_status_tree()
+        popup.destroy()
+
+    # Add buttons
+    button_frame = ttk.Frame(popup)
+    button_frame.pack(fill="x", padx=10, pady=10)
+
+    save_button = tk.Button(button_frame, text="Save Grades", bg="#3b5998", fg="white",
+                          font=("Arial", 10), padx=10, pady=2, bd=0, command=save_sheet)
+    save_button.pack(side="right", padx=5)
+
+    cancel_button = tk.Button(button_frame, text="Cancel", bg="#f44336", fg="black",
+                            font=("Arial", 10), padx=10, pady=2, bd=0, command=popup.destroy)
+    cancel_button.pack(side="right", padx=5)
+
 def view_grades():
     # Get selected student
     selected = grade_status_tree.focus()
@@ -1135,15 +1409,17 @@ def view_grades():
         messagebox.showwarning("Select Student", "Please select a student to view grades.")
         return
     
-    student_data = grade_status_tree.item(selected, "values")
-    student_id = student_data[0]
-    student_name = student_data[1]
+    student = selected_student(grade_status_tree)
+    if student is None:
+        return
+    student_id, student_name = student.student_id, student.name
     
-    grade_file = f"grades_{student_id}.txt"
-    if not os.path.exists(grade_file):
+    grades = backend.fetch_student_grades(student_id)
+    if not grades:
         messagebox.showinfo("No Grades", f"No grades have been entered for {student_name}.")
         return
-    
+    content = backend.format_grades(student_id, student_name, grades)
+
     # Display grade details
     popup = tk.Toplevel(root)
     popup.title(f"Grade Details - {student_name}")
@@ -1166,10 +1442,6 @@ def view_grades():
     scrollbar.pack(side="right", fill="y")
     
     text_widget = tk.Text(text_frame, wrap="word", yscrollcommand=scrollbar.set, bg="white", fg="black")
-    
-    with open(grade_file, "r") as f:
-        content = f.read()
-    
     text_widget.insert("1.0", content)
     text_widget.config(state="disabled")  # Make read-only
     text_widget.pack(side="left", fill="both", expand=True)
@@ -1186,29 +1458,108 @@ def delete_grades():
         messagebox.showwarning("Select Student", "Please select a student to delete grades.")
         return
     
-    student_data = grade_status_tree.item(selected, "values")
-    student_id = student_data[0]
-    student_name = student_data[1]
+    student = selected_student(grade_status_tree)
+    if student is None:
+        return
+    student_id, student_name = student.student_id, student.name
     
-    grade_file = f"grades_{student_id}.txt"
-    if not os.path.exists(grade_file):
+    if not backend.has_grades(student_id):
         messagebox.showinfo("No Grades", f"No grades have been entered for {student_name}.")
         return
-    
+
     if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the grades for {student_name}?"):
-        # Delete from file
-        os.remove(grade_file)
-        
-        # Delete from database
         try:
-            cursor.execute("DELETE FROM Grade WHERE student_id = ?", (student_id,))
-            conn.commit()
-        except Exception as e:
+            backend.delete_grades(student_id)
+        except sqlite3.Error as e:
             messagebox.showerror("Error", f"Could not delete grades from database: {e}")
-            
+            return
         refresh_grade_status_tree()
         messagebox.showinfo("Grades Deleted", f"Grades for {student_name} have been deleted.")
 
+def export_grades():
+    # Writes the grade report of the selected student to a text file on request
+    selected = grade_status_tree.focus()
+    if not selected:
+        messagebox.showwarning("Select Student", "Please select a student to export grades.")
+        return
+
+    student = selected_student(grade_status_tree)
+    if student is None:
+        return
+    student_id, student_name = student.student_id, student.name
+
+    grades = backend.fetch_student_grades(student_id)
+    if not grades:
+        messagebox.showinfo("No Grades", f"No grades have been entered for {student_name}.")
+        return
+
+    grade_file = filedialog.asksaveasfilename(title="Export Grades",
+                                              initialfile=f"grades_{student_id}.txt",
+                                              defaultextension=".txt",
+                                              filetypes=[("Text files", "*.txt")])
+    if not grade_file:
+        return
+
+    try:
+        with open(grade_file, "w") as f:
+            f.write(backend.format_grades(student_id, student_name, grades))
+            f.write(f"Date Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    except OSError as e:
+        messagebox.showerror("Error", f"Could not export grades: {e}")
+        return
+
+    messagebox.showinfo("Grades Exported", f"Grades for {student_name} have been exported to {grade_file}.")
+
+def export_all_transcripts():
+    # Writes grades_{id}.txt for every graded student with
+    # scholarsync.transcripts, run as a subprocess so its worker processes
+    # never fork this one; its progress lines drive the progress bar
+    if cli_args.server:
+        messagebox.showinfo("Export All Transcripts",
+                            "Bulk transcripts are written on the machine that has the database. "
+                            "Run python -m scholarsync.transcripts there.")
+        return
+    directory = filedialog.askdirectory(title="Export All Transcripts")
+    if not directory:
+        return
+
+    job = subprocess.Popen(
+        [sys.executable, "-m", "scholarsync.transcripts", directory, "--db", os.path.abspath(DB_PATH), "--progress"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    progress = {"written": 0, "total": 0}
+
+    def read_progress():
+        for line in job.stdout:
+            written, total = line.split()
+            progress.update(written=int(written), total=int(total))
+    reader = threading.Thread(target=read_progress, daemon=True)
+    reader.start()
+
+    popup = tk.Toplevel(root)
+    popup.title("Export All Transcripts")
+    popup.geometry("360x120")
+    popup.configure(bg=BACKGROUND_COLOR)
+    progress_label = ttk.Label(popup, text="Starting...")
+    progress_label.pack(pady=(20, 5))
+    progress_bar = ttk.Progressbar(popup, mode="determinate", length=300)
+    progress_bar.pack(pady=5)
+
+    def poll():
+        if progress["total"]:
+            progress_bar.config(maximum=progress["total"], value=progress["written"])
+            progress_label.config(text=f"{progress['written']} of {progress['total']} transcripts written")
+        if job.poll() is None or reader.is_alive():
+            root.after(100, poll)
+            return
+        popup.destroy()
+        if job.returncode != 0:
+            messagebox.showerror("Export Failed", job.stderr.read().strip() or f"Exit status {job.returncode}")
+        else:
+            messagebox.showinfo("Transcripts Exported", f"{progress['written']} transcripts written to {directory}.")
+
+    root.after(100, poll)
+
 # Create buttons for grade entry tab
 button_frame = ttk.Frame(grade_entry_frame)
 button_frame.pack(fill="x", padx=10, pady=5)
@@ -1218,6 +1569,10 @@ enter_btn = tk.Button(button_frame, text="Enter Grades", command=enter_grades,
                     bg="#3b5998", fg="white", font=("Arial", 10), padx=10, pady=2, bd=0)
 enter_btn.pack(side="left", padx=5)
 
+section_btn = tk.Button(button_frame, text="Grade Section", command=grade_course_section,
+                      bg="#3b5998", fg="white", font=("Arial", 10), padx=10, pady=2, bd=0)
+section_btn.pack(side="left", padx=5)
+
 view_btn = tk.Button(button_frame, text="View Grades", command=view_grades,
                    bg="#3b5998", fg="white", font=("Arial", 10), padx=10, pady=2, bd=0)
 view_btn.pack(side="left", padx=5)
@@ -1226,12 +1581,20 @@ delete_btn = tk.Button(button_frame, text="Delete Grades", command=delete_grades
                      bg="#3b5998", fg="white", font=("Arial", 10), padx=10, pady=2, bd=0)
 delete_btn.pack(side="left", padx=5)
 
+export_btn = tk.Button(button_frame, text="Export Grades", command=export_grades,
+                     bg="#3b5998", fg="white", font=("Arial", 10), padx=10, pady=2, bd=0)
+export_btn.pack(side="left", padx=5)
+
+export_all_btn = tk.Button(button_frame, text="Export All", command=export_all_transcripts,
+                         bg="#3b5998", fg="white", font=("Arial", 10), padx=10, pady=2, bd=0)
+export_all_btn.pack(side="left", padx=5)
+
 refresh_btn = tk.Button(button_frame, text="Refresh", command=refresh_grade_status_tree,
                       bg="#d3d3d3", fg="black", font=("Arial", 10), padx=10, pady=2, bd=0)
 refresh_btn.pack(side="left", padx=5)
 
-# Initialize the grade status tree
-refresh_grade_status_tree()
+# Load the grade status tree when the tab is first shown
+load_on_first_select(grade_entry_frame, refresh_grade_status_tree)
 
 
 # -------------
@@ -1272,27 +1635,23 @@ reg_scrollbar = ttk.Scrollbar(status_frame, orient="vertical", command=registrat
 registration_tree.configure(yscrollcommand=reg_scrollbar.set)
 reg_scrollbar.place(relx=1, rely=0, relheight=1, anchor='ne')
 
+# Configure tag colors
+registration_tree.tag_configure("registered", background="#e3f2fd")  # Light blue background for registered
+registration_tree.tag_configure("not_registered", background="#ffebee")  # Light red background for not registered
+
+def format_registration_status(row):
+    # Add color indicator based on status
+    student_id, name, registered = row
+    if registered:
+        return (student_id, name, "Completed"), ("registered",)
+    return (student_id, name, "Not Registered"), ("not_registered",)
+
+# Students are paged in like the other large trees
+registration_pager = PagedTree(registration_tree, reg_scrollbar, "registration-status",
+                               format_row=format_registration_status)
+
 def refresh_registration_tree():
-    # Clear existing data
-    for row in registration_tree.get_children():
-        registration_tree.delete(row)
-    
-    # Get all students
-    cursor.execute("SELECT student_id, name FROM Student")
-    students = cursor.fetchall()
-    
-    # Check registration status for each student
-    for student_id, name in students:
-        registration_file = f"registration_{student_id}.txt"
-        status = "Completed" if os.path.exists(registration_file) else "Not Registered"
-        
-        # Add color indicator based on status
-        tag = "registered" if status == "Completed" else "not_registered"
-        item_id = registration_tree.insert("", "end", values=(student_id, name, status), tags=(tag,))
-    
-    # Configure tag colors
-    registration_tree.tag_configure("registered", background="#e3f2fd")  # Light blue background for registered
-    registration_tree.tag_configure("not_registered", background="#ffebee")  # Light red background for not registered
+    registration_pager.reset()
 
 def register_courses():
     # Get selected student
@@ -1301,9 +1660,10 @@ def register_courses():
         messagebox.showwarning("Select Student", "Please select a student to register courses for.")
         return
     
-    student_data = registration_tree.item(selected, "values")
-    student_id = student_data[0]
-    student_name = student_data[1]
+    student = selected_student(registration_tree)
+    if student is None:
+        return
+    student_id, student_name = student.student_id, student.name
     
     # Create registration popup
     popup = tk.Toplevel(root)
@@ -1319,8 +1679,7 @@ def register_courses():
     popup_header.pack(pady=15)
     
     # Get all available courses
-    cursor.execute("SELECT course_id, course_name, credits FROM Course")
-    courses = cursor.fetchall()
+    courses = session.courses()
     
     # Create a frame for the course selection
     course_frame = ttk.LabelFrame(popup, text="Available Courses")
@@ -1346,8 +1705,8 @@ def register_courses():
                                selectforeground="white",
                                height=12)
     
-    for course_id, course_name, credits in courses:
-        course_listbox.insert(tk.END, f"{course_id} - {course_name} ({credits} credits)")
+    for course in courses:
+        course_listbox.insert(tk.END, f"{course.course_id} - {course.course_name} ({course.credits} credits)")
     
     course_listbox.pack(side="left", fill="both", expand=True)
     scrollbar.config(command=course_listbox.yview)
@@ -1389,19 +1748,15 @@ def register_courses():
             return
         
         # Get selected courses
-        selected_courses = [course_listbox.get(i) for i in selected_indices]
-        
-        # Save registration data to file
-        registration_file = f"registration_{student_id}.txt"
-        with open(registration_file, "w") as f:
-            f.write(f"Student ID: {student_id}\n")
-            f.write(f"Student Name: {student_name}\n")
-            f.write(f"Semester: {semester}\n")
-            f.write("Registered Courses:\n")
-            for course in selected_courses:
-                f.write(f"- {course}\n")
-            f.write(f"Registration Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        
+        selected_course_ids = [courses[i].course_id for i in selected_indices]
+
+        # Replace this semester's registration in one transaction
+        try:
+            backend.save_registration(student_id, int(semester), selected_course_ids)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Could not save registration: {e}")
+            return
+
         messagebox.showinfo("Registration Complete", f"Course registration completed for {student_name}.")
         refresh_registration_tree()
         popup.destroy()
@@ -1441,15 +1796,16 @@ def view_registration():
         messagebox.showwarning("Select Student", "Please select a student to view registration.")
         return
     
-    student_data = registration_tree.item(selected, "values")
-    student_id = student_data[0]
-    student_name = student_data[1]
+    student = selected_student(registration_tree)
+    if student is None:
+        return
+    student_id, student_name = student.student_id, student.name
     
-    registration_file = f"registration_{student_id}.txt"
-    if not os.path.exists(registration_file):
+    registered_courses = backend.fetch_registrations(student_id)
+    if not registered_courses:
         messagebox.showinfo("No Registration", f"{student_name} has not registered for any courses.")
         return
-    
+
     # Display registration details
     popup = tk.Toplevel(root)
     popup.title(f"Registration Details - {student_name}")
@@ -1482,10 +1838,9 @@ def view_registration():
                         highlightbackground="#ccc",
                         padx=10,
                         pady=10)
-    
-    with open(registration_file, "r") as f:
-        content = f.read()
-    
+
+    content = format_registration(student_id, student_name, registered_courses)
+
     text_widget.insert("1.0", content)
     text_widget.config(state="disabled")  # Make read-only
     text_widget.pack(side="left", fill="both", expand=True)
@@ -1510,17 +1865,21 @@ def delete_registration():
         messagebox.showwarning("Select Student", "Please select a student to delete registration.")
         return
     
-    student_data = registration_tree.item(selected, "values")
-    student_id = student_data[0]
-    student_name = student_data[1]
+    student = selected_student(registration_tree)
+    if student is None:
+        return
+    student_id, student_name = student.student_id, student.name
     
-    registration_file = f"registration_{student_id}.txt"
-    if not os.path.exists(registration_file):
+    if not backend.has_registration(student_id):
         messagebox.showinfo("No Registration", f"{student_name} has not registered for any courses.")
         return
-    
+
     if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the registration for {student_name}?"):
-        os.remove(registration_file)
+        try:
+            backend.delete_registration(student_id)
+        except sqlite3.Error as e:
+            messagebox.showerror("Error", f"Could not delete registration from database: {e}")
+            return
         refresh_registration_tree()
         messagebox.showinfo("Registration Deleted", f"Registration for {student_name} has been deleted.")
 
@@ -1591,8 +1950,8 @@ help_label = tk.Label(help_frame,
                     bg=BACKGROUND_COLOR)
 help_label.pack(side="left", padx=10)
 
-# Initialize the registration tree
-refresh_registration_tree()
+# Load the registration tree when the tab is first shown
+load_on_first_select(registration_frame, refresh_registration_tree)
 
 # -------------
 # CGPA Calculator Tab
@@ -1631,9 +1990,8 @@ student_var = tk.StringVar()
 
 # Function to fetch and populate student list
 def populate_student_list():
-    cursor.execute("SELECT student_id, name FROM Student")
-    students = cursor.fetchall()
-    student_choices = {f"{sid} - {name}": sid for sid, name in students}
+    students = session.all_students()
+    student_choices = {f"{student.student_id} - {student.name}": student.student_id for student in students}
     student_menu['values'] = list(student_choices.keys())
     return student_choices
 
@@ -1642,8 +2000,14 @@ student_menu = ttk.Combobox(selection_inner_frame, textvariable=student_var,
                         width=30, state="readonly")
 student_menu.pack(side="left", padx=5, fill="x", expand=True)
 
-# Initial population of the dropdown
-student_choices = populate_student_list()
+# The dropdown is filled when the tab is first shown
+student_choices = {}
+
+def load_student_list():
+    global student_choices
+    student_choices = populate_student_list()
+
+load_on_first_select(calculator_frame, load_student_list)
 
 # Middle part: Results Display
 results_frame = ttk.LabelFrame(calculator_frame, text="GPA Results")
@@ -1722,51 +2086,27 @@ def calculate_cgpa():
         messagebox.showwarning("Selection Error", "Please select a student.")
         return
     
-    student_id = student_choices[student_selection]
-    
-    # Get all semesters for this student
-    cursor.execute("SELECT DISTINCT semester FROM Grade WHERE student_id = ? ORDER BY semester", (student_id,))
-    semesters = [row[0] for row in cursor.fetchall()]
-    
-    if not semesters:
-        messagebox.showinfo("No Data", "No grade data found for this student.")
-        cgpa_value.config(text="--")
-        total_credits_value.config(text="--")
+    student = session.student(student_choices[student_selection])
+    if student is None:
+        messagebox.showwarning("Student Not Found", "That student no longer exists. Please refresh the list.")
         return
-    
-    # Calculate SGPA for each semester
-    semester_credits = []
-    semester_sgpas = []
-    
-    for semester in semesters:
-        cursor.execute("""
-            SELECT g.grade_point, c.credits 
-            FROM Grade g 
-            JOIN Course c ON g.course_id = c.course_id 
-            WHERE g.student_id = ? AND g.semester = ?
-        """, (student_id, semester))
-        grades = cursor.fetchall()
-        
-        total_points = sum(grade * credits for grade, credits in grades)
-        total_credits = sum(credits for _, credits in grades)
-        
-        if total_credits > 0:
-            sgpa = total_points / total_credits
-            semester_credits.append(total_credits)
-            semester_sgpas.append(sgpa)
-            sgpa_tree.insert("", "end", values=(f"Semester {semester}", f"{sgpa:.2f}", total_credits))
-    
-    # Calculate CGPA
-    total_weighted_sgpa = sum(sgpa * credits for sgpa, credits in zip(semester_sgpas, semester_credits))
-    total_all_credits = sum(semester_credits)
-    
-    if total_all_credits > 0:
-        cgpa = total_weighted_sgpa / total_all_credits
-        cgpa_value.config(text=f"{cgpa:.2f}")
-        total_credits_value.config(text=f"{total_all_credits}")
-    else:
-        cgpa_value.config(text="--")
-        total_credits_value.config(text="--")
+    student_id = student.student_id
+
+    def show_result(result):
+        if result is None:
+            messagebox.showinfo("No Data", "No grade data found for this student.")
+            cgpa_value.config(text="--")
+            total_credits_value.config(text="--")
+            return
+
+        for semester in result.semesters:
+            sgpa_tree.insert("", "end", values=(f"Semester {semester.semester}", f"{semester.sgpa:.2f}", semester.credits))
+
+        cgpa_value.config(text=f"{result.cgpa:.2f}")
+        total_credits_value.config(text=f"{result.total_credits}")
+
+    # SGPA per semester and CGPA in a single grouped query, off the Tk thread
+    run_in_background("compute_cgpa", student_id, on_done=show_result)
 
 def refresh_calculator():
     # Update the student list from the database
@@ -1787,6 +2127,85 @@ def refresh_calculator():
     # Show a confirmation message
     messagebox.showinfo("Refresh Complete", "Student list has been refreshed from the database.")
 
+def show_leaderboard():
+    # CGPA for the whole cohort in one streaming pass over the grouped query
+    run_in_background("rank_cohort", on_done=open_leaderboard)
+
+def open_leaderboard(ranked):
+    if not ranked:
+        messagebox.showinfo("No Data", "No grade data found for any student.")
+        return
+
+    popup = tk.Toplevel(root)
+    popup.title("Cohort Leaderboard")
+    popup.geometry("650x500")
+    popup.configure(bg=BACKGROUND_COLOR)
+
+    popup_header = tk.Label(popup, text=f"Cohort Leaderboard ({len(ranked)} students)",
+                            font=("Arial", 14, "bold"),
+                            fg=PRIMARY_COLOR,
+                            bg=BACKGROUND_COLOR)
+    popup_header.pack(pady=15)
+
+    board_frame = ttk.Frame(popup)
+    board_frame.pack(fill="both", expand=True, padx=15, pady=10)
+
+    columns = ("Rank", "ID", "Student", "CGPA", "Credits", "Semesters")
+    board_tree = ttk.Treeview(board_frame, columns=columns, show="headings")
+    board_tree.column("Rank", width=60, anchor="center")
+    board_tree.column("ID", width=60, anchor="center")
+    board_tree.column("Student", width=220)
+    board_tree.column("CGPA", width=80, anchor="center")
+    board_tree.column("Credits", width=80, anchor="center")
+    board_tree.column("Semesters", width=80, anchor="center")
+
+    board_scrollbar = ttk.Scrollbar(board_frame, orient="vertical", command=board_tree.yview)
+    board_tree.configure(yscrollcommand=board_scrollbar.set)
+    board_scrollbar.pack(side="right", fill="y")
+    board_tree.pack(side="left", fill="both", expand=True)
+
+    # Sort keys work on the ranked data rather than the displayed strings
+    sort_keys = {
+        "Rank": lambda row: (row[0], row[1]),
+        "ID": lambda row: row[1],
+        "Student": lambda row: row[2].lower(),
+        "CGPA": lambda row: (row[3].cgpa, row[3].total_credits),
+        "Credits": lambda row: row[3].total_credits,
+        "Semesters": lambda row: len(row[3].semesters),
+    }
+    sort_state = {"column": "Rank", "descending": False}
+
+    def fill_board():
+        board_tree.delete(*board_tree.get_children())
+        rows = sorted(ranked, key=sort_keys[sort_state["column"]], reverse=sort_state["descending"])
+        for rank, student_id, name, result in rows:
+            board_tree.insert("", "end", values=(rank, student_id, name, f"{result.cgpa:.2f}",
+                                                 result.total_credits, len(result.semesters)))
+
+    def sort_by(column):
+        if sort_state["column"] == column:
+            sort_state["descending"] = not sort_state["descending"]
+        else:
+            sort_state["column"] = column
+            sort_state["descending"] = column in ("CGPA", "Credits", "Semesters")
+        fill_board()
+
+    for column in columns:
+        board_tree.heading(column, text=column, command=lambda c=column: sort_by(c))
+
+    fill_board()
+
+    close_button = tk.Button(popup,
+                            text="Close",
+                            command=popup.destroy,
+                            bg=SECONDARY_COLOR,
+                            fg=TEXT_COLOR,
+                            font=("Arial", 11),
+                            padx=20,
+                            pady=5,
+                            borderwidth=0)
+    close_button.pack(pady=15)
+
 # Button frame for calculate and refresh buttons
 calc_button_frame = ttk.Frame(calculator_frame)
 calc_button_frame.pack(pady=10)
@@ -1814,6 +2233,17 @@ refresh_button = tk.Button(calc_button_frame,
                         borderwidth=0)
 refresh_button.pack(side="left", padx=5)
 
+leaderboard_button = tk.Button(calc_button_frame,
+                        text="Cohort Leaderboard",
+                        command=show_leaderboard,
+                        bg=PRIMARY_COLOR,
+                        fg="white",
+                        font=("Arial", 11, "bold"),
+                        padx=10,
+                        pady=5,
+                        borderwidth=0)
+leaderboard_button.pack(side="left", padx=5)
+
 # Formula display
 formula_frame = ttk.LabelFrame(calculator_frame, text="Formula Reference")
 formula_frame.pack(fill="x", padx=10, pady=10)
@@ -1840,10 +2270,91 @@ formula_label = tk.Label(formula_box,
                         padx=10, 
                         pady=10)
 formula_label.pack()
+
+# -------------
+# Diagnostics Tab
+# -------------
+# Calls, latency and rows of every named query (scholarsync.queries). With
+# --server these are the server's figures.
+
+diagnostics_frame = ttk.Frame(notebook)
+notebook.add(diagnostics_frame, text="Diagnostics")
+
+header_label = ttk.Label(diagnostics_frame, text="Query Diagnostics", font=("Arial", 14, "bold"), foreground=PRIMARY_COLOR)
+header_label.pack(pady=10)
+
+query_tree_frame = ttk.Frame(diagnostics_frame)
+query_tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+query_columns = ("Query", "Calls", "Total ms", "Mean ms", "p95 ms", "Rows")
+query_tree = ttk.Treeview(query_tree_frame, columns=query_columns, show="headings")
+for column in query_columns:
+    query_tree.heading(column, text=column)
+    query_tree.column(column, width=90, anchor="e")
+query_tree.column("Query", width=320, anchor="w")
+query_tree.pack(side="left", fill="both", expand=True)
+
+scrollbar = ttk.Scrollbar(query_tree_frame, orient="vertical", command=query_tree.yview)
+query_tree.configure(yscrollcommand=scrollbar.set)
+scrollbar.pack(side="right", fill="y")
+
+query_summary_label = ttk.Label(diagnostics_frame, text="")
+query_summary_label.pack(pady=5)
+
+def show_query_stats(stats):
+    query_tree.delete(*query_tree.get_children())
+    for stat in stats:
+        # Statements missing from the registry are shown by their SQL
+        query_tree.insert("", "end", values=(
+            stat["name"] or stat["sql"], stat["calls"], f"{stat['total_ms']:.1f}",
+            f"{stat['mean_ms']:.2f}", f"{stat['p95_ms']:.2f}", stat["rows"]))
+    calls = sum(stat["calls"] for stat in stats)
+    total_ms = sum(stat["total_ms"] for stat in stats)
+    ran = sum(1 for stat in stats if stat["calls"])
+    query_summary_label.config(text=f"{ran} of {len(stats)} statements run, {calls} calls, {total_ms:.1f} ms in total")
+
+def refresh_query_stats():
+    run_in_background("query_stats", on_done=show_query_stats)
+
+def reset_query_stats():
+    backend.reset_query_stats()
+    refresh_query_stats()
+
+def dump_query_stats_json():
+    path = filedialog.asksaveasfilename(title="Dump Query Statistics",
+                                        initialfile="query_stats.json",
+                                        defaultextension=".json",
+                                        filetypes=[("JSON files", "*.json")])
+    if not path:
+        return
+    try:
+        with open(path, "w") as f:
+            dump_query_stats(f, backend.query_stats())
+    except OSError as e:
+        messagebox.showerror("Error", f"Could not write query statistics: {e}")
+        return
+    messagebox.showinfo("Query Statistics", f"Query statistics written to {path}.")
+
+query_button_frame = ttk.Frame(diagnostics_frame)
+query_button_frame.pack(pady=10)
+
+refresh_button = tk.Button(query_button_frame, text="Refresh", command=refresh_query_stats, bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=10)
+refresh_button.pack(side="left", padx=5)
+
+reset_button = tk.Button(query_button_frame, text="Reset", command=reset_query_stats, bg=SECONDARY_COLOR, fg=TEXT_COLOR, font=("Arial", 10), padx=10, pady=10, width=10)
+reset_button.pack(side="left", padx=5)
+
+dump_button = tk.Button(query_button_frame, text="Dump JSON", command=dump_query_stats_json, bg=PRIMARY_COLOR, fg=WHITE, font=("Arial", 10), padx=10, pady=10, width=10)
+dump_button.pack(side="left", padx=5)
+
+load_on_first_select(diagnostics_frame, refresh_query_stats)
+
 # -----------------------------
 # Main loop
 # -----------------------------
+# Only the tab that is selected at startup loads now
+on_tab_changed()
 root.mainloop()
 
-# Close the database connection when the app exits
-conn.close()
\ No newline at end of file
+# Close the database connections when the app exits
+backend.close()
\ No newline at end of file
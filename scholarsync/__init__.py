@@ -0,0 +1,59 @@
+"""ScholarSync core: data access, grade math and reports without a GUI.
+
+    from scholarsync import connect, compute_cgpa
+
+    db = connect("student_grades.db")
+    result = compute_cgpa(db, 42)
+"""
+import importlib
+
+from .database import (
+    DEFAULT_DB_PATH, DEFAULT_PROFILE, PROFILES, configure, connect, connect_read_only, migrate,
+    has_student_search,
+)
+from .grades import (
+    GRADE_POINTS, GRADE_LETTERS, SemesterResult, CGPAResult,
+    parse_semester, save_grade_batch, fetch_section_grades, fetch_student_grades, grade_status,
+    has_grades, delete_grades, compute_cgpa, iter_all_cgpa, rank_cohort,
+)
+from .registrations import (
+    registration_status, save_registration, latest_registration, course_semesters,
+    fetch_registrations, has_registration, delete_registration,
+    migrate_registration_files,
+)
+from .records import (
+    add_student, update_student, delete_student, list_student_names, fetch_students,
+    add_course, update_course, delete_course, list_courses, course_name, course_professor,
+    add_professor, update_professor, delete_professor, professor_courses, list_professors,
+)
+from .search import SEARCH_LIMIT, search_students_by_text
+from .iterators import (
+    BATCH_SIZE, StudentRecord, CourseRecord, GradeRecord, ProfessorRecord,
+    iter_students, iter_courses, iter_grades, iter_professors,
+)
+from .reports import format_grades, format_registration
+from .transactions import BUSY_TIMEOUT, write_transaction
+from .queries import QUERIES, register_query, statement_cache_size, query_timings, dump_query_stats
+from .changes import ChangeTracker
+from .worker import DatabaseWorker
+from .model import Student, Course, Grade, Registration, Session
+
+# The command-line modules (python -m scholarsync.roster, .export,
+# .transcripts) and the backends, which import roster, are only loaded when
+# one of their names is first used. Importing them here would have runpy
+# find the module already imported when it is run with -m.
+LAZY_IMPORTS = {
+    "ROSTER_KINDS": "roster", "RosterResult": "roster", "import_roster": "roster",
+    "import_roster_file": "roster",
+    "EXPORT_FORMATS": "export", "REPORTS": "export", "export_report": "export",
+    "write_transcripts": "transcripts",
+    "OPERATIONS": "backend", "LocalBackend": "backend",
+    "RemoteBackend": "client",
+}
+
+def __getattr__(name):
+    if name not in LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{LAZY_IMPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
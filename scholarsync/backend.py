@@ -0,0 +1,99 @@
+"""Named operations and the local backend.
+
+A front end calls operations by name on a backend instead of calling the core
+functions with its own connection, so the same code runs against a database
+file (LocalBackend) or a ScholarSync server (scholarsync.client.RemoteBackend):
+
+    backend = LocalBackend("student_grades.db")
+    backend.add_student("Jane Doe", "jane@university.edu")
+    future = backend.submit("rank_cohort")  # On the background worker
+
+Every operation is called as fn(db, *args), with arguments and results that
+survive a JSON round trip (the server exposes exactly this table).
+"""
+import io
+from functools import partial
+
+from .database import DEFAULT_DB_PATH, DEFAULT_PROFILE, connect
+from .grades import (
+    compute_cgpa, delete_grades, fetch_section_grades, fetch_student_grades, grade_status,
+    has_grades, rank_cohort, save_grade_batch,
+)
+from .records import (
+    add_course, add_professor, add_student, change_stamp, course_name, course_professor,
+    delete_course, delete_course_with_records, delete_professor, delete_student, fetch_students,
+    fetch_tree_page, fetch_tree_row, list_courses, list_professors, list_student_names,
+    list_students, professor_courses, update_course, update_professor, update_student,
+)
+from .registrations import (
+    course_semesters, delete_registration, fetch_registrations, has_registration,
+    latest_registration, registration_status, save_registration,
+)
+from .queries import query_timings
+from .reports import format_grades
+from .roster import import_roster, import_roster_file
+from .search import search_students_by_text
+from .transactions import interactive as make_interactive
+from .worker import DatabaseWorker
+
+def import_roster_text(db, text, kind):
+    # import_roster for CSV content sent by a client rather than a local path
+    return import_roster_file(db, io.StringIO(text, newline=""), kind)
+
+def query_stats(db):
+    # Per-query figures of this process's timed connections (see
+    # scholarsync.queries); run on a server, the server's
+    return query_timings.snapshot()
+
+def reset_query_stats(db):
+    query_timings.reset()
+
+OPERATIONS = {fn.__name__: fn for fn in (
+    add_student, update_student, delete_student, list_student_names, list_students, fetch_students,
+    add_course, update_course, delete_course, delete_course_with_records, list_courses, course_name,
+    course_professor,
+    add_professor, update_professor, delete_professor, professor_courses, list_professors,
+    fetch_tree_page, fetch_tree_row,
+    save_grade_batch, fetch_section_grades, fetch_student_grades, grade_status, has_grades,
+    delete_grades, compute_cgpa, rank_cohort, format_grades,
+    registration_status, save_registration, latest_registration, course_semesters,
+    fetch_registrations, has_registration, delete_registration,
+    search_students_by_text, import_roster_text, query_stats, reset_query_stats, change_stamp,
+)}
+
+# Locally a roster is read straight from its path instead of being sent as text
+LOCAL_OPERATIONS = {**OPERATIONS, "import_roster": import_roster}
+
+
+class LocalBackend:
+    # Operations on a database file: calls run on this thread's connection,
+    # submitted ones on a DatabaseWorker with its own. With timed=True both
+    # connections record per-query timings for query_stats. With
+    # interactive=True a call's write gives up on a held lock after about a
+    # second (see scholarsync.transactions); submitted ones still wait.
+    def __init__(self, path=DEFAULT_DB_PATH, profile=DEFAULT_PROFILE, timed=False, interactive=False):
+        self.db = connect(path, profile, timed=timed)
+        if interactive:
+            make_interactive(self.db)
+        self.worker = DatabaseWorker(path, profile, timed)
+
+    def __getattr__(self, op):
+        # backend.compute_cgpa(student_id) is backend.call("compute_cgpa", student_id)
+        if op not in LOCAL_OPERATIONS:
+            raise AttributeError(op)
+        return partial(self.call, op)
+
+    def call(self, op, *args):
+        return LOCAL_OPERATIONS[op](self.db, *args)
+
+    def batch(self, calls):
+        # [(op, *args), ...] -> [result, ...]
+        return [self.call(*call) for call in calls]
+
+    def submit(self, op, *args):
+        # Runs op on the worker and returns a Future with its result
+        return self.worker.submit(LOCAL_OPERATIONS[op], *args)
+
+    def close(self):
+        self.worker.stop()
+        self.db.close()
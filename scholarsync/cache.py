@@ -0,0 +1,55 @@
+"""Size-bounded LRU cache for reference data."""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    # Keys are tuples whose first item names the kind of lookup, e.g.
+    # ("course_name", 12), so one kind can be dropped at once. Safe to share
+    # between the GUI thread and the database worker.
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Bumped by every invalidation; a value loaded across one is stale
+        self.generation = 0
+
+    def get(self, key, load):
+        # Returns the cached value for key, calling load() on a miss. None
+        # results are not cached, so a row that appears later is found.
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            generation = self.generation
+        value = load()
+        if value is not None:
+            with self.lock:
+                if generation != self.generation:
+                    return value
+                self.entries[key] = value
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *keys):
+        with self.lock:
+            self.generation += 1
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def invalidate_kind(self, *kinds):
+        with self.lock:
+            self.generation += 1
+            for key in [key for key in self.entries if key[0] in kinds]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
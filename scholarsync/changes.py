@@ -0,0 +1,24 @@
+"""Change tracking for incremental view refreshes."""
+
+
+class ChangeTracker:
+    # Records which primary keys the CRUD functions touched since the last
+    # refresh, so a refresh only has to apply that delta to the loaded rows
+    def __init__(self):
+        self.changes = {}
+
+    def record(self, table, key, kind):
+        table_changes = self.changes.setdefault(table, {})
+        iid = str(key)
+        previous = table_changes.get(iid)
+        if previous == "insert" and kind == "delete":
+            del table_changes[iid]
+        elif previous == "insert":
+            pass  # Still a new row, just with newer values
+        elif previous == "delete" and kind == "insert":
+            table_changes[iid] = "update"
+        else:
+            table_changes[iid] = kind
+
+    def take(self, table):
+        return self.changes.pop(table, {})
@@ -0,0 +1,162 @@
+"""Remote backend: the LocalBackend interface over a ScholarSync server.
+
+    backend = RemoteBackend("http://127.0.0.1:8765")
+    backend.compute_cgpa(student_id)
+    backend.batch([("list_professors",), ("course_professor", course_id)])
+
+Each thread keeps one keep-alive HTTP connection. Errors raised by an
+operation on the server are raised here again as the same sqlite3 exception
+(or ValueError), so callers handle both backends alike; a server that cannot
+be reached raises OSError. JSON turns tuples into lists, so the few results
+that are named tuples are rebuilt before they are returned.
+"""
+import http.client
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+from .backend import OPERATIONS
+from .grades import CGPAResult, SemesterResult
+from .roster import RosterResult
+
+REQUEST_TIMEOUT = 60
+
+ERROR_TYPES = {
+    "IntegrityError": sqlite3.IntegrityError,
+    "OperationalError": sqlite3.OperationalError,
+    "DatabaseError": sqlite3.DatabaseError,
+    "ProgrammingError": sqlite3.ProgrammingError,
+    "ValueError": ValueError,
+    "TypeError": TypeError,
+    "KeyError": ValueError,
+}
+
+
+def decode_cgpa(result):
+    if result is None:
+        return None
+    student_id, semesters, weighted_points, total_credits = result
+    return CGPAResult(student_id, tuple(SemesterResult(*semester) for semester in semesters),
+                      weighted_points, total_credits)
+
+def decode_ranking(rows):
+    return [(rank, student_id, name, decode_cgpa(result)) for rank, student_id, name, result in rows]
+
+def decode_roster(result):
+    inserted, errors = result
+    return RosterResult(inserted, [tuple(error) for error in errors])
+
+RESULT_DECODERS = {
+    "compute_cgpa": decode_cgpa,
+    "rank_cohort": decode_ranking,
+    "import_roster_text": decode_roster,
+}
+
+
+class RemoteError(sqlite3.Error):
+    # A server-side failure with no local equivalent (HTTP 401, 404, 500 ...)
+    pass
+
+
+def raise_error(payload, status):
+    error_type = ERROR_TYPES.get(payload.get("type"), RemoteError)
+    message = payload.get("error", f"HTTP {status}")
+    raise error_type(message)
+
+
+class RemoteBackend:
+    def __init__(self, url, token=None, timeout=REQUEST_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"expected an http:// server URL, got {url!r}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.token = token
+        self.timeout = timeout
+        self.local = threading.local()
+        # Submitted operations run one at a time, in order, like DatabaseWorker
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scholarsync-client")
+
+    def __getattr__(self, op):
+        if op not in OPERATIONS and op != "import_roster":
+            raise AttributeError(op)
+        return partial(self.call, op)
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        for attempt in range(2):
+            connection = getattr(self.local, "connection", None)
+            if connection is None:
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                self.local.connection = connection
+            reused = connection.sock is not None
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                connection.close()
+                self.local.connection = None
+                # Nothing came back. On a reused keep-alive connection that is
+                # the server having closed it while idle, before the request
+                # arrived, so it is sent once more on a new connection. On a
+                # new one the server may have run it before failing, and a
+                # write must not run twice.
+                if not reused or attempt:
+                    raise
+                continue
+            try:
+                data = response.read()
+            except OSError:
+                connection.close()
+                self.local.connection = None
+                raise
+            break
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            raise RemoteError(f"HTTP {response.status}: unexpected response from server")
+        if response.status != 200:
+            raise_error(payload, response.status)
+        return payload
+
+    def call(self, op, *args):
+        if op == "import_roster":
+            return self.import_roster(*args)
+        result = self.request("POST", f"/api/{op}", {"args": list(args)})["result"]
+        decode = RESULT_DECODERS.get(op)
+        return decode(result) if decode else result
+
+    def import_roster(self, path, kind):
+        # The CSV is read here and sent as text; the server has no access to it
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return self.call("import_roster_text", f.read(), kind)
+
+    def batch(self, calls):
+        # [(op, *args), ...] -> [result, ...] in one request. The first
+        # failed call is raised after the batch has run.
+        payload = self.request("POST", "/batch", {"calls": [list(call) for call in calls]})
+        results = []
+        for call, outcome in zip(calls, payload["results"]):
+            if "error" in outcome:
+                raise_error(outcome, 200)
+            decode = RESULT_DECODERS.get(call[0])
+            results.append(decode(outcome["result"]) if decode else outcome["result"])
+        return results
+
+    def submit(self, op, *args):
+        return self.worker.submit(self.call, op, *args)
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def close(self):
+        self.worker.shutdown()
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
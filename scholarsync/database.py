@@ -0,0 +1,316 @@
+"""Database connection and versioned schema migrations."""
+import sqlite3
+import weakref
+from pathlib import Path
+
+from .grades import GRADE_POINTS, rebuild_semester_summary
+from .queries import TimedConnection, register_query, statement_cache_size
+from .transactions import BUSY_TIMEOUT, begin_immediate
+
+# The schema is versioned with PRAGMA user_version. MIGRATIONS[n] upgrades a
+# database from version n to n + 1; every pending migration runs once at
+# startup inside a single transaction, so nothing on the hot path needs to
+# probe sqlite_master.
+
+DEFAULT_DB_PATH = "student_grades.db"
+
+# Connection profiles, applied by configure() to every new connection. All of
+# them use WAL so readers never block the writer and profiles can be mixed on
+# one database; they differ in how much durability they trade for speed.
+#   safe       every commit is fsynced (synchronous=FULL)
+#   fast       WAL fsyncs at checkpoints only; a power cut can lose the last
+#              commits but never corrupts the database
+#   bulk-load  no fsync at all and rare checkpoints; for one-off imports
+PROFILES = {
+    "safe": {
+        "journal_mode": "WAL", "synchronous": "FULL", "foreign_keys": "ON",
+        "temp_store": "MEMORY", "cache_size": -16384, "mmap_size": 0,
+    },
+    "fast": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "foreign_keys": "ON",
+        "temp_store": "MEMORY", "cache_size": -65536, "mmap_size": 268435456,
+    },
+    "bulk-load": {
+        "journal_mode": "WAL", "synchronous": "OFF", "foreign_keys": "ON",
+        "temp_store": "MEMORY", "cache_size": -262144, "mmap_size": 268435456,
+        "wal_autocheckpoint": 16384,
+    },
+}
+DEFAULT_PROFILE = "safe"
+
+def pragma_sql(name, value):
+    return f"PRAGMA {name} = {value}"
+
+# Every profile setting is a named statement, shared by the profiles that use it
+for pragmas in PROFILES.values():
+    for name, value in pragmas.items():
+        register_query(f"set {name} {value}", pragma_sql(name, value))
+
+def configure(db, profile=DEFAULT_PROFILE):
+    # Applies a named profile (or a dict of pragmas) to an open connection
+    pragmas = PROFILES[profile] if isinstance(profile, str) else profile
+    for name, value in pragmas.items():
+        db.execute(pragma_sql(name, value))
+    return db
+
+class Connection(sqlite3.Connection):
+    # sqlite3's own connections cannot be weakly referenced; these can, so
+    # per-connection state such as records.reference_cache can be kept in a
+    # WeakKeyDictionary beside them
+    pass
+
+
+def connection_options(timed=False):
+    # sqlite3.connect arguments for every connection: a statement cache that
+    # holds all of the registered queries, and with timed=True a connection
+    # that records their timings (see scholarsync.queries)
+    return {"cached_statements": statement_cache_size(),
+            "factory": TimedConnection if timed else Connection}
+
+def connect(path=DEFAULT_DB_PATH, profile=DEFAULT_PROFILE, timeout=BUSY_TIMEOUT, timed=False):
+    # Opens the database and brings its schema up to date
+    db = configure(sqlite3.connect(path, timeout=timeout, **connection_options(timed)), profile)
+    migrate(db)
+    return db
+
+def connect_read_only(path=DEFAULT_DB_PATH, timeout=BUSY_TIMEOUT, timed=False):
+    # A connection that cannot write, for reader processes. The schema is
+    # not migrated; open the database once with connect() first.
+    uri = Path(path).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, timeout=timeout, **connection_options(timed))
+
+def table_columns(db, table):
+    return [row[1] for row in db.execute(f"PRAGMA table_info({table})")]
+
+def migrate_base_schema(db):
+    # Version 1: core tables, registrations and the covering indexes for the
+    # hot lookups. Uses IF NOT EXISTS because databases created before
+    # versioning already have some of these tables.
+    db.execute('''CREATE TABLE IF NOT EXISTS Student (
+                    student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL)''')
+    db.execute('''CREATE TABLE IF NOT EXISTS Course (
+                    course_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    course_name TEXT NOT NULL UNIQUE,
+                    credits INTEGER NOT NULL)''')
+    db.execute('''CREATE TABLE IF NOT EXISTS Grade (
+                    grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id INTEGER NOT NULL,
+                    course_id INTEGER NOT NULL,
+                    semester INTEGER NOT NULL,
+                    grade_point REAL NOT NULL,
+                    FOREIGN KEY (student_id) REFERENCES Student(student_id),
+                    FOREIGN KEY (course_id) REFERENCES Course(course_id))''')
+    if "grade_point" not in table_columns(db, "Grade"):
+        migrate_letter_grade_table(db)
+    db.execute('''CREATE TABLE IF NOT EXISTS Professor (
+                    professor_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    first_name TEXT NOT NULL,
+                    last_name TEXT NOT NULL,
+                    department TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL)''')
+    db.execute('''CREATE TABLE IF NOT EXISTS CourseAssignment (
+                    assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    course_id INTEGER NOT NULL,
+                    professor_id INTEGER NOT NULL,
+                    FOREIGN KEY (course_id) REFERENCES Course(course_id),
+                    FOREIGN KEY (professor_id) REFERENCES Professor(professor_id))''')
+    db.execute('''CREATE TABLE IF NOT EXISTS Registration (
+                    student_id INTEGER NOT NULL,
+                    course_id INTEGER NOT NULL,
+                    semester INTEGER NOT NULL,
+                    registered_at TEXT NOT NULL,
+                    PRIMARY KEY (student_id, semester, course_id),
+                    FOREIGN KEY (student_id) REFERENCES Student(student_id),
+                    FOREIGN KEY (course_id) REFERENCES Course(course_id))''')
+    db.execute('''CREATE INDEX IF NOT EXISTS idx_registration_course
+                    ON Registration (course_id, semester)''')
+    # Grade by student: CGPA, grade reports, status probes and deletes
+    db.execute('''CREATE INDEX IF NOT EXISTS idx_grade_student_semester
+                    ON Grade (student_id, semester, course_id, grade_point)''')
+    db.execute("DROP INDEX IF EXISTS idx_grade_student")
+    # Course tree join and professor deletes
+    db.execute('''CREATE INDEX IF NOT EXISTS idx_course_assignment_course
+                    ON CourseAssignment (course_id, professor_id)''')
+    db.execute('''CREATE INDEX IF NOT EXISTS idx_course_assignment_professor
+                    ON CourseAssignment (professor_id, course_id)''')
+
+def migrate_letter_grade_table(db):
+    # An older Grade Entry layout stored the letter grade as text without a
+    # semester. Rebuild it in the grade_point layout, defaulting to semester 1.
+    db.execute("ALTER TABLE Grade RENAME TO LetterGrade")
+    db.execute('''CREATE TABLE Grade (
+                    grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id INTEGER NOT NULL,
+                    course_id INTEGER NOT NULL,
+                    semester INTEGER NOT NULL,
+                    grade_point REAL NOT NULL,
+                    FOREIGN KEY (student_id) REFERENCES Student(student_id),
+                    FOREIGN KEY (course_id) REFERENCES Course(course_id))''')
+    db.executemany("INSERT INTO Grade (student_id, course_id, semester, grade_point) VALUES (?, ?, 1, ?)",
+                   [(student_id, course_id, GRADE_POINTS.get(grade, 0.0))
+                    for student_id, course_id, grade in db.execute("SELECT student_id, course_id, grade FROM LetterGrade")])
+    db.execute("DROP TABLE LetterGrade")
+
+def migrate_student_search(db):
+    # Version 2: full-text index over student name and email, kept in sync by
+    # triggers. Skipped when the SQLite build has no FTS5 (search uses LIKE).
+    try:
+        db.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS StudentSearch USING fts5(
+                        name, email,
+                        content='Student', content_rowid='student_id',
+                        prefix='1 2 3')''')
+    except sqlite3.OperationalError:
+        return
+    db.execute('''CREATE TRIGGER IF NOT EXISTS student_search_insert AFTER INSERT ON Student BEGIN
+                    INSERT INTO StudentSearch (rowid, name, email)
+                    VALUES (new.student_id, new.name, new.email);
+                  END''')
+    db.execute('''CREATE TRIGGER IF NOT EXISTS student_search_delete AFTER DELETE ON Student BEGIN
+                    INSERT INTO StudentSearch (StudentSearch, rowid, name, email)
+                    VALUES ('delete', old.student_id, old.name, old.email);
+                  END''')
+    db.execute('''CREATE TRIGGER IF NOT EXISTS student_search_update AFTER UPDATE OF name, email ON Student BEGIN
+                    INSERT INTO StudentSearch (StudentSearch, rowid, name, email)
+                    VALUES ('delete', old.student_id, old.name, old.email);
+                    INSERT INTO StudentSearch (rowid, name, email)
+                    VALUES (new.student_id, new.name, new.email);
+                  END''')
+    # Index the students that were added before search existed
+    db.execute("INSERT INTO StudentSearch (StudentSearch) VALUES ('rebuild')")
+
+def migrate_student_program(db):
+    # Version 3: the Grade Entry tab declared Student with a program column;
+    # add it (optional) so both layouts agree
+    if "program" not in table_columns(db, "Student"):
+        db.execute("ALTER TABLE Student ADD COLUMN program TEXT")
+
+def migrate_unique_grades(db):
+    # Version 4: one grade per student, course and semester so re-entered
+    # grades can be upserted. Older databases may hold duplicates from the
+    # insert-then-update fallback; the most recently entered one is kept.
+    db.execute("""
+        DELETE FROM Grade WHERE grade_id NOT IN (
+            SELECT MAX(grade_id) FROM Grade GROUP BY student_id, semester, course_id)
+    """)
+    # Keyed course first: per-student reads stay on the covering
+    # idx_grade_student_semester, and this one serves course sections
+    db.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_grade_course_section
+                    ON Grade (course_id, semester, student_id)''')
+
+def migrate_semester_summary(db):
+    # Version 5: credit-weighted points and credits per student and semester,
+    # kept current by triggers so CGPA reads one row per semester instead of
+    # every grade. Grades whose course does not exist count for nothing, the
+    # same as the inner join the totals were computed with before.
+    db.execute('''CREATE TABLE IF NOT EXISTS SemesterSummary (
+                    student_id INTEGER NOT NULL,
+                    semester INTEGER NOT NULL,
+                    weighted_points REAL NOT NULL,
+                    credits INTEGER NOT NULL,
+                    PRIMARY KEY (student_id, semester)) WITHOUT ROWID''')
+
+    add_grade = """
+        INSERT INTO SemesterSummary (student_id, semester, weighted_points, credits)
+        SELECT new.student_id, new.semester, new.grade_point * c.credits, c.credits
+        FROM Course c WHERE c.course_id = new.course_id
+        ON CONFLICT (student_id, semester) DO UPDATE SET
+            weighted_points = weighted_points + excluded.weighted_points,
+            credits = credits + excluded.credits;
+    """
+    remove_grade = """
+        UPDATE SemesterSummary SET
+            weighted_points = weighted_points - old.grade_point * c.credits,
+            credits = SemesterSummary.credits - c.credits
+        FROM (SELECT credits FROM Course WHERE course_id = old.course_id) AS c
+        WHERE student_id = old.student_id AND semester = old.semester;
+        DELETE FROM SemesterSummary
+        WHERE student_id = old.student_id AND semester = old.semester
+          AND NOT EXISTS (SELECT 1 FROM Grade WHERE student_id = old.student_id AND semester = old.semester);
+    """
+    db.execute(f"""CREATE TRIGGER IF NOT EXISTS semester_summary_grade_insert AFTER INSERT ON Grade BEGIN
+                    {add_grade}
+                  END""")
+    db.execute(f"""CREATE TRIGGER IF NOT EXISTS semester_summary_grade_delete AFTER DELETE ON Grade BEGIN
+                    {remove_grade}
+                  END""")
+    db.execute(f"""CREATE TRIGGER IF NOT EXISTS semester_summary_grade_update
+                    AFTER UPDATE OF student_id, course_id, semester, grade_point ON Grade BEGIN
+                    {remove_grade}
+                    {add_grade}
+                  END""")
+
+    # A course's grades move with its credits. A course with grades cannot
+    # be deleted (foreign keys are on in every profile); deleting it with
+    # records.delete_course_with_records removes its grades first, through
+    # the Grade triggers.
+    db.execute("""CREATE TRIGGER IF NOT EXISTS semester_summary_course_credits
+                    AFTER UPDATE OF credits ON Course BEGIN
+                    UPDATE SemesterSummary SET
+                        weighted_points = weighted_points + g.grade_point * (new.credits - old.credits),
+                        credits = SemesterSummary.credits + new.credits - old.credits
+                    FROM (SELECT student_id, semester, grade_point FROM Grade WHERE course_id = new.course_id) AS g
+                    WHERE SemesterSummary.student_id = g.student_id AND SemesterSummary.semester = g.semester;
+                  END""")
+    rebuild_semester_summary(db)
+
+def migrate_drop_course_delete_trigger(db):
+    # Version 6: version 5 also kept SemesterSummary current when a graded
+    # course was deleted, which the foreign key on Grade never allows
+    db.execute("DROP TRIGGER IF EXISTS semester_summary_course_delete")
+
+MIGRATIONS = [
+    migrate_base_schema,
+    migrate_student_search,
+    migrate_student_program,
+    migrate_unique_grades,
+    migrate_semester_summary,
+    migrate_drop_course_delete_trigger,
+]
+
+SCHEMA_VERSION_SQL = register_query("schema version", "PRAGMA user_version")
+STUDENT_SEARCH_TABLE_SQL = register_query("student search installed",
+                                          "SELECT 1 FROM sqlite_master WHERE name = 'StudentSearch'")
+
+def migrate(db):
+    version = db.execute(SCHEMA_VERSION_SQL).fetchone()[0]
+    if not MIGRATIONS[version:]:
+        return version
+    # Another client may be migrating too; read the version again once this
+    # connection holds the write lock
+    begin_immediate(db)
+    version = db.execute(SCHEMA_VERSION_SQL).fetchone()[0]
+    pending = MIGRATIONS[version:]
+    if not pending:
+        db.rollback()
+        return version
+    try:
+        student_search_tables.pop(db, None)  # Migrations may create it
+    except TypeError:
+        pass
+    try:
+        for migration in pending:
+            migration(db)
+        db.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        db.commit()
+    except sqlite3.Error:
+        db.rollback()
+        raise
+    return len(MIGRATIONS)
+
+# connection: whether it has the StudentSearch table, read once per
+# connection instead of on every search
+student_search_tables = weakref.WeakKeyDictionary()
+
+def has_student_search(db):
+    # Whether migrate_student_search could create the FTS5 table
+    try:
+        return student_search_tables[db]
+    except KeyError:
+        installed = db.execute(STUDENT_SEARCH_TABLE_SQL).fetchone() is not None
+        student_search_tables[db] = installed
+        return installed
+    except TypeError:
+        # A plain sqlite3 connection, which cannot be weakly referenced
+        return db.execute(STUDENT_SEARCH_TABLE_SQL).fetchone() is not None
@@ -0,0 +1,227 @@
+"""Streaming exports: transcripts, grade sheets and CGPA summaries.
+
+Rows go from the cursor through generators straight into the output file,
+so memory stays flat however many students are exported. Any report can be
+limited to a set of students and written as CSV, JSONL or fixed-width text:
+
+    python -m scholarsync.export transcripts transcripts.csv [--students 1-500,731]
+    python -m scholarsync.export cgpa cgpa.txt --format txt
+
+    with open("sheets.jsonl", "w") as f:
+        export_report(db, "grade-sheets", f, "jsonl", students=[1, 2, 3])
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import groupby
+from typing import Callable, NamedTuple, Tuple
+
+from .database import DEFAULT_DB_PATH, connect
+from .grades import GRADE_LETTERS
+from .queries import register_query
+
+EXPORT_FORMATS = ("csv", "jsonl", "txt")
+
+# Grade rows with each semester's SGPA, in transcript order. The student
+# filter goes in {where}; the order follows idx_grade_student_semester.
+TRANSCRIPT_SQL = """
+    SELECT g.student_id, s.name, g.semester, g.course_id, c.course_name, c.credits, g.grade_point,
+           ss.weighted_points / ss.credits AS sgpa
+    FROM Grade g
+    JOIN Student s ON s.student_id = g.student_id
+    JOIN Course c ON c.course_id = g.course_id
+    LEFT JOIN SemesterSummary ss ON ss.student_id = g.student_id AND ss.semester = g.semester
+    {where}
+    ORDER BY g.student_id, g.semester, g.course_id
+"""
+
+# Every registered student of every course section with their grade, if any
+GRADE_SHEET_SQL = """
+    SELECT r.course_id, c.course_name, r.semester, r.student_id, s.name, g.grade_point
+    FROM Registration r
+    JOIN Course c ON c.course_id = r.course_id
+    JOIN Student s ON s.student_id = r.student_id
+    LEFT JOIN Grade g ON g.course_id = r.course_id
+                     AND g.semester = r.semester
+                     AND g.student_id = r.student_id
+    {where}
+    ORDER BY r.course_id, r.semester, r.student_id
+"""
+
+# Semester totals with the student's name, folded into one row per student
+CGPA_SUMMARY_SQL = """
+    SELECT ss.student_id, s.name, ss.weighted_points, ss.credits
+    FROM SemesterSummary ss
+    JOIN Student s ON s.student_id = ss.student_id
+    WHERE ss.credits > 0 {where}
+    ORDER BY ss.student_id, ss.semester
+"""
+
+
+class Column(NamedTuple):
+    name: str
+    width: int  # Fixed-width text only
+    number: bool = False
+
+
+class Report(NamedTuple):
+    columns: Tuple[Column, ...]
+    rows: Callable  # rows(db, students) -> iterator of tuples
+
+
+def student_filter(column, students, keyword="WHERE"):
+    # SQL condition and parameters limiting column to a set of student ids
+    # (None for everyone). The ids are bound as one JSON array.
+    if students is None:
+        return "", ()
+    return f"{keyword} {column} IN (SELECT value FROM json_each(?))", (json.dumps([int(s) for s in students]),)
+
+# Each export, for everyone and for a student set
+for name, sql, column, keyword in (("transcript export", TRANSCRIPT_SQL, "g.student_id", "WHERE"),
+                                   ("grade sheet export", GRADE_SHEET_SQL, "r.student_id", "WHERE"),
+                                   ("cgpa summary export", CGPA_SUMMARY_SQL, "ss.student_id", "AND")):
+    register_query(name, sql.format(where=""))
+    register_query(f"{name} for a student set", sql.format(where=student_filter(column, [], keyword)[0]))
+
+def transcript_rows(db, students=None):
+    where, params = student_filter("g.student_id", students)
+    for student_id, name, semester, course_id, course_name, credits, grade_point, sgpa in \
+            db.execute(TRANSCRIPT_SQL.format(where=where), params):
+        yield (student_id, name, semester, course_id, course_name, credits, grade_point,
+               GRADE_LETTERS.get(grade_point, "--"), None if sgpa is None else round(sgpa, 2))
+
+def grade_sheet_rows(db, students=None):
+    where, params = student_filter("r.student_id", students)
+    for course_id, course_name, semester, student_id, name, grade_point in \
+            db.execute(GRADE_SHEET_SQL.format(where=where), params):
+        letter_grade = GRADE_LETTERS.get(grade_point, "--") if grade_point is not None else ""
+        yield course_id, course_name, semester, student_id, name, grade_point, letter_grade
+
+def cgpa_rows(db, students=None):
+    where, params = student_filter("ss.student_id", students, keyword="AND")
+    cur = db.execute(CGPA_SUMMARY_SQL.format(where=where), params)
+    for (student_id, name), semesters in groupby(cur, key=lambda row: row[:2]):
+        weighted_points = credits = count = 0
+        for _, _, semester_points, semester_credits in semesters:
+            weighted_points += semester_points
+            credits += semester_credits
+            count += 1
+        yield student_id, name, count, credits, round(weighted_points / credits, 2)
+
+REPORTS = {
+    "transcripts": Report((
+        Column("student_id", 10, True), Column("name", 28), Column("semester", 8, True),
+        Column("course_id", 9, True), Column("course_name", 28), Column("credits", 7, True),
+        Column("grade_point", 11, True), Column("grade", 5), Column("sgpa", 5, True),
+    ), transcript_rows),
+    "grade-sheets": Report((
+        Column("course_id", 9, True), Column("course_name", 28), Column("semester", 8, True),
+        Column("student_id", 10, True), Column("name", 28), Column("grade_point", 11, True),
+        Column("grade", 5),
+    ), grade_sheet_rows),
+    "cgpa": Report((
+        Column("student_id", 10, True), Column("name", 28), Column("semesters", 9, True),
+        Column("credits", 7, True), Column("cgpa", 5, True),
+    ), cgpa_rows),
+}
+
+def write_csv(f, columns, rows):
+    writer = csv.writer(f)
+    writer.writerow([column.name for column in columns])
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(f, columns, rows):
+    names = [column.name for column in columns]
+    count = 0
+    for row in rows:
+        f.write(json.dumps(dict(zip(names, row)), ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+def fixed_width(value, column):
+    if value is None:
+        text = ""
+    elif isinstance(value, float):
+        text = f"{value:.2f}"
+    else:
+        text = str(value)
+    text = text[:column.width]
+    return text.rjust(column.width) if column.number else text.ljust(column.width)
+
+def write_text(f, columns, rows):
+    f.write(" ".join(fixed_width(column.name, column) for column in columns).rstrip() + "\n")
+    f.write(" ".join("-" * column.width for column in columns) + "\n")
+    count = 0
+    for row in rows:
+        f.write(" ".join(fixed_width(value, column) for value, column in zip(row, columns)).rstrip() + "\n")
+        count += 1
+    return count
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "txt": write_text}
+
+def export_report(db, report, f, export_format="csv", students=None):
+    # Streams one report into an open text file; returns the rows written.
+    # Open CSV targets with newline="".
+    columns, rows = REPORTS[report]
+    return WRITERS[export_format](f, columns, rows(db, students))
+
+def parse_student_set(text):
+    # "1-500,731" -> [1, ..., 500, 731]
+    students = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        try:
+            first = int(first)
+            last = int(last) if last else first
+        except ValueError:
+            raise ValueError(f"not a student id or range: {part}")
+        students.extend(range(first, last + 1))
+    return students
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scholarsync.export",
+                                     description="Stream a report to CSV, JSONL or fixed-width text.")
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("output", help="output file, or - for stdout")
+    parser.add_argument("--format", choices=EXPORT_FORMATS,
+                        help="default: from the output file's extension, else csv")
+    parser.add_argument("--students", help="student ids and ranges, e.g. 1-500,731 (default: all)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    args = parser.parse_args(argv)
+
+    export_format = args.format
+    if export_format is None:
+        extension = os.path.splitext(args.output)[1].lstrip(".").lower()
+        export_format = extension if extension in EXPORT_FORMATS else "csv"
+    try:
+        students = parse_student_set(args.students) if args.students else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    db = connect(args.db)
+    try:
+        if args.output == "-":
+            count = export_report(db, args.report, sys.stdout, export_format, students)
+        else:
+            with open(args.output, "w", newline="", encoding="utf-8") as f:
+                count = export_report(db, args.report, f, export_format, students)
+    except OSError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+    print(f"{count} rows exported", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Grade storage and SGPA / CGPA aggregation."""
+from typing import NamedTuple, Tuple
+
+from .queries import register_query
+from .transactions import write_transaction
+
+# The Grade table is the only record of a student's grades; text files are
+# only written when a report is explicitly exported.
+
+# Letter grades and their grade points
+GRADE_POINTS = {
+    "AA": 10.0, "AB": 9.0,
+    "BB": 8.0, "BC": 7.0, "CC": 6.0,
+    "CD": 5.0, "DD": 4.0,
+    "FF": 0.0
+}
+GRADE_LETTERS = {points: letter for letter, points in GRADE_POINTS.items()}
+
+def parse_semester(value):
+    # "3" -> 3, "Semester 3" -> 3, anything without digits -> 1
+    digits = ''.join(filter(str.isdigit, str(value)))
+    return int(digits) if digits else 1
+
+# Every student with whether any grade is stored
+GRADE_STATUS_SQL = """
+    SELECT s.student_id, s.name,
+           EXISTS (SELECT 1 FROM Grade g WHERE g.student_id = s.student_id) AS graded
+    FROM Student s
+    {where}
+"""
+GRADE_STATUS_LIST_SQL = register_query("grade status list", GRADE_STATUS_SQL.format(where=""))
+
+STUDENT_GRADES_SQL = register_query("student grades", """
+    SELECT g.semester, g.course_id, c.course_name, c.credits, g.grade_point
+    FROM Grade g
+    LEFT JOIN Course c ON g.course_id = c.course_id
+    WHERE g.student_id = ?
+    ORDER BY g.semester, g.course_id
+""")
+
+# Re-entered grades overwrite the stored one (idx_grade_course_section)
+UPSERT_GRADE_SQL = register_query("save grades", """
+    INSERT INTO Grade (student_id, course_id, semester, grade_point)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (course_id, semester, student_id)
+    DO UPDATE SET grade_point = excluded.grade_point
+""")
+
+def save_grade_batch(db, rows):
+    # rows: (student_id, course_id, semester, grade_point). The whole batch is
+    # one upsert statement in one transaction.
+    rows = list(rows)
+    with write_transaction(db):
+        db.executemany(UPSERT_GRADE_SQL, rows)
+    return len(rows)
+
+# Every student registered for one course section with their grade, if any
+SECTION_GRADES_SQL = register_query("section grade sheet", """
+    SELECT r.student_id, s.name, g.grade_point
+    FROM Registration r
+    JOIN Student s ON s.student_id = r.student_id
+    LEFT JOIN Grade g ON g.student_id = r.student_id
+                     AND g.semester = r.semester
+                     AND g.course_id = r.course_id
+    WHERE r.course_id = ? AND r.semester = ?
+    ORDER BY r.student_id
+""")
+
+def fetch_section_grades(db, course_id, semester):
+    # (student_id, name, grade_point or None) for a course section
+    return db.execute(SECTION_GRADES_SQL, (course_id, semester)).fetchall()
+
+def fetch_student_grades(db, student_id):
+    # (semester, course_id, course_name, credits, grade_point) for one student
+    return db.execute(STUDENT_GRADES_SQL, (student_id,)).fetchall()
+
+def grade_status(db):
+    # (student_id, name, graded) for every student
+    return db.execute(GRADE_STATUS_LIST_SQL).fetchall()
+
+HAS_GRADES_SQL = register_query("grade exists", "SELECT 1 FROM Grade WHERE student_id = ? LIMIT 1")
+DELETE_GRADES_SQL = register_query("delete student grades", "DELETE FROM Grade WHERE student_id = ?")
+
+def has_grades(db, student_id):
+    return db.execute(HAS_GRADES_SQL, (student_id,)).fetchone() is not None
+
+def delete_grades(db, student_id):
+    with write_transaction(db):
+        db.execute(DELETE_GRADES_SQL, (student_id,))
+
+# -----------------------------
+# Grade Aggregation (SGPA / CGPA)
+# -----------------------------
+# SemesterSummary holds one (student, semester) row with the credit-weighted
+# points and credits, maintained by triggers on Grade and Course, so a CGPA
+# reads one row per semester rather than every grade. The results are shared
+# by the CGPA tab, reports and exports.
+
+class SemesterResult(NamedTuple):
+    semester: int
+    weighted_points: float
+    credits: int
+
+    @property
+    def sgpa(self) -> float:
+        return self.weighted_points / self.credits
+
+
+class CGPAResult(NamedTuple):
+    student_id: int
+    semesters: Tuple[SemesterResult, ...]
+    weighted_points: float
+    total_credits: int
+
+    @property
+    def cgpa(self) -> float:
+        # Σ(Credits × SGPA) / Σ(Credits) reduces to Σ(Credits × Grade Points) / Σ(Credits)
+        return self.weighted_points / self.total_credits
+
+
+SEMESTER_TOTALS_SQL = """
+    SELECT student_id, semester, weighted_points, credits
+    FROM SemesterSummary
+    WHERE credits > 0 {where}
+    ORDER BY student_id, semester
+"""
+STUDENT_SEMESTER_TOTALS_SQL = register_query("cgpa for one student",
+                                             SEMESTER_TOTALS_SQL.format(where="AND student_id = ?"))
+ALL_SEMESTER_TOTALS_SQL = register_query("cgpa for all students", SEMESTER_TOTALS_SQL.format(where=""))
+
+# The same totals computed from the raw grades, used to (re)build the summary
+GRADE_TOTALS_SQL = register_query("semester totals from grades", """
+    SELECT g.student_id, g.semester,
+           SUM(g.grade_point * c.credits) AS weighted_points,
+           SUM(c.credits) AS credits
+    FROM Grade g
+    JOIN Course c ON g.course_id = c.course_id
+    GROUP BY g.student_id, g.semester
+""")
+CLEAR_SUMMARY_SQL = register_query("clear semester summary", "DELETE FROM SemesterSummary")
+REBUILD_SUMMARY_SQL = register_query(
+    "semester summary rebuild",
+    f"INSERT INTO SemesterSummary (student_id, semester, weighted_points, credits) {GRADE_TOTALS_SQL}")
+
+def rebuild_semester_summary(db):
+    # Recomputes SemesterSummary from Grade; the triggers keep it current after
+    db.execute(CLEAR_SUMMARY_SQL)
+    db.execute(REBUILD_SUMMARY_SQL)
+
+def fold_semester_totals(rows):
+    # Turn (student_id, semester, weighted_points, credits) rows ordered by
+    # student into one CGPAResult per student, without buffering the input
+    current_id = None
+    semesters = []
+    for student_id, semester, weighted_points, credits in rows:
+        if student_id != current_id:
+            if semesters:
+                yield make_cgpa_result(current_id, semesters)
+            current_id = student_id
+            semesters = []
+        semesters.append(SemesterResult(semester, weighted_points, credits))
+    if semesters:
+        yield make_cgpa_result(current_id, semesters)
+
+def make_cgpa_result(student_id, semesters):
+    return CGPAResult(student_id, tuple(semesters),
+                      sum(s.weighted_points for s in semesters),
+                      sum(s.credits for s in semesters))
+
+def compute_cgpa(db, student_id):
+    # Returns the CGPAResult for one student, or None if no graded credits exist
+    cur = db.execute(STUDENT_SEMESTER_TOTALS_SQL, (student_id,))
+    return next(fold_semester_totals(cur), None)
+
+def iter_all_cgpa(db):
+    # Streams a CGPAResult for every student that has graded credits
+    cur = db.execute(ALL_SEMESTER_TOTALS_SQL)
+    return fold_semester_totals(cur)
+
+STUDENT_NAMES_SQL = register_query("student names", "SELECT student_id, name FROM Student")
+
+def rank_cohort(db):
+    # Ranks every graded student by CGPA (ties share a rank, e.g. 1, 1, 3).
+    # Returns a list of (rank, student_id, name, CGPAResult).
+    names = dict(db.execute(STUDENT_NAMES_SQL))
+    results = sorted(iter_all_cgpa(db), key=lambda r: (-r.cgpa, -r.total_credits, r.student_id))
+
+    ranked = []
+    previous_cgpa = None
+    rank = 0
+    for position, result in enumerate(results, start=1):
+        cgpa = round(result.cgpa, 6)
+        if cgpa != previous_cgpa:
+            rank = position
+            previous_cgpa = cgpa
+        ranked.append((rank, result.student_id, names.get(result.student_id, ""), result))
+    return ranked
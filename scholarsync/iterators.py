@@ -0,0 +1,88 @@
+"""Lazy keyset iteration over whole tables.
+
+iter_students(db) and friends yield one record at a time but fetch
+batch_size rows per query, each query starting after the last primary key
+seen. No cursor is held open between batches and memory does not grow with
+the table, so they are as cheap on a million students as on a thousand and
+never keep a read transaction open while the caller works.
+
+    for student in iter_students(db, batch_size=500):
+        print(student.student_id, student.name)
+
+Pass after=<key> to resume where an earlier iteration stopped.
+"""
+from typing import NamedTuple, Optional
+
+from .queries import register_query
+from .records import PROFESSOR_TREE_SQL, page_sql
+
+BATCH_SIZE = 1000
+
+STUDENTS_SQL = "SELECT student_id, name, email, program FROM Student {where}"
+COURSES_SQL = "SELECT course_id, course_name, credits FROM Course {where}"
+GRADES_SQL = "SELECT grade_id, student_id, course_id, semester, grade_point FROM Grade {where}"
+
+# Professors are read with the Professors tree's page statements
+for table, select_sql, key_column in (("students", STUDENTS_SQL, "student_id"),
+                                      ("courses", COURSES_SQL, "course_id"),
+                                      ("grades", GRADES_SQL, "grade_id")):
+    register_query(f"iterate {table}", page_sql(select_sql, key_column))
+    register_query(f"iterate {table} after", page_sql(select_sql, key_column, ">"))
+
+
+class StudentRecord(NamedTuple):
+    student_id: int
+    name: str
+    email: str
+    program: Optional[str]
+
+
+class CourseRecord(NamedTuple):
+    course_id: int
+    course_name: str
+    credits: int
+
+
+class GradeRecord(NamedTuple):
+    grade_id: int
+    student_id: int
+    course_id: int
+    semester: int
+    grade_point: float
+
+
+class ProfessorRecord(NamedTuple):
+    professor_id: int
+    first_name: str
+    last_name: str
+    department: str
+    email: str
+
+
+def iter_keyset(db, select_sql, key_column, batch_size=BATCH_SIZE, after=None, record=None):
+    # Rows of select_sql (with a {where} placeholder, key selected first) in
+    # key order, batch_size per query. record._make wraps each row if given.
+    while True:
+        if after is None:
+            rows = db.execute(page_sql(select_sql, key_column), (batch_size,)).fetchall()
+        else:
+            rows = db.execute(page_sql(select_sql, key_column, ">"), (after, batch_size)).fetchall()
+        if record is not None:
+            yield from map(record._make, rows)
+        else:
+            yield from rows
+        if len(rows) < batch_size:
+            return
+        after = rows[-1][0]
+
+def iter_students(db, batch_size=BATCH_SIZE, after=None):
+    return iter_keyset(db, STUDENTS_SQL, "student_id", batch_size, after, StudentRecord)
+
+def iter_courses(db, batch_size=BATCH_SIZE, after=None):
+    return iter_keyset(db, COURSES_SQL, "course_id", batch_size, after, CourseRecord)
+
+def iter_grades(db, batch_size=BATCH_SIZE, after=None):
+    return iter_keyset(db, GRADES_SQL, "grade_id", batch_size, after, GradeRecord)
+
+def iter_professors(db, batch_size=BATCH_SIZE, after=None):
+    return iter_keyset(db, PROFESSOR_TREE_SQL, "professor_id", batch_size, after, ProfessorRecord)
@@ -0,0 +1,184 @@
+"""Domain records and a per-session identity map.
+
+Student, Course, Grade and Registration are small __slots__ classes: named,
+typed attributes instead of positional tuples, and no per-instance __dict__
+(see benchmarks/domain_model_memory.py for the footprint). A Session keeps
+one instance per primary key, so a student loaded by one tab is the same
+object every other tab gets, and an edit made through the session shows up
+in all of them:
+
+    session = Session(backend)           # LocalBackend or RemoteBackend
+    student = session.student(42)
+    student is session.student(42)       # True, loaded once
+    session.update_student(42, "Jane Roe", student.email)
+    student.name                         # "Jane Roe"
+
+Another workstation may change the database at any time. Each lookup first
+asks the backend for its change stamp, one cheap call; once that differs,
+each mapped student is read again on its next use, into the same instance,
+and the course list is loaded again.
+Grades and registrations are fetched fresh on each call, but they refer to
+the session's Student and Course instances.
+"""
+from typing import Optional
+
+
+class Record:
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Student(Record):
+    __slots__ = ("student_id", "name", "email", "program")
+
+    def __init__(self, student_id: int, name: str, email: str, program: Optional[str] = None):
+        self.student_id = student_id
+        self.name = name
+        self.email = email
+        self.program = program
+
+
+class Course(Record):
+    __slots__ = ("course_id", "course_name", "credits")
+
+    def __init__(self, course_id: int, course_name: str, credits: int):
+        self.course_id = course_id
+        self.course_name = course_name
+        self.credits = credits
+
+
+class Grade(Record):
+    __slots__ = ("student", "course", "semester", "grade_point")
+
+    def __init__(self, student: Student, course: Optional[Course], semester: int, grade_point: float):
+        self.student = student
+        self.course = course  # None once the course has been deleted
+        self.semester = semester
+        self.grade_point = grade_point
+
+
+class Registration(Record):
+    __slots__ = ("student", "course", "semester", "registered_at")
+
+    def __init__(self, student: Student, course: Course, semester: int, registered_at: str):
+        self.student = student
+        self.course = course
+        self.semester = semester
+        self.registered_at = registered_at
+
+
+class Session:
+    # Identity map over a backend. Records are reused for as long as the
+    # database is unchanged, whoever writes to it.
+    def __init__(self, backend):
+        self.backend = backend
+        self.students = {}
+        self.fresh = set()  # Ids of students read since the last change
+        self.all_students_read = False
+        self.course_map = None  # All courses, loaded together on first use
+        self.stamp = None
+
+    def sync(self):
+        # Marks every record stale once the database has changed since the
+        # last lookup
+        stamp = self.backend.change_stamp()
+        if stamp != self.stamp:
+            self.stamp = stamp
+            self.fresh.clear()
+            self.all_students_read = False
+            self.course_map = None
+
+    def student(self, student_id):
+        # The Student with this id, or None if there is none
+        student_id = int(student_id)
+        self.load_students([student_id])
+        return self.students.get(student_id)
+
+    def load_students(self, student_ids):
+        # Reads the ids that are not fresh with one call; returns the
+        # Students that exist, in the order asked for
+        self.sync()
+        student_ids = [int(student_id) for student_id in student_ids]
+        missing = [student_id for student_id in student_ids if student_id not in self.fresh]
+        if missing:
+            self.read_students(missing, self.backend.fetch_students(missing))
+        return [self.students[student_id] for student_id in student_ids if student_id in self.students]
+
+    def all_students(self):
+        # Every Student, by id
+        self.sync()
+        if not self.all_students_read:
+            self.read_students(list(self.students), self.backend.list_students())
+            self.all_students_read = True
+        return sorted(self.students.values(), key=lambda student: student.student_id)
+
+    def read_students(self, student_ids, rows):
+        # Updates the mapped instances in place from rows, adds new ones and
+        # forgets those of student_ids that no longer exist
+        gone = set(student_ids)
+        for student_id, name, email, program in rows:
+            student = self.students.get(student_id)
+            if student is None:
+                self.students[student_id] = Student(student_id, name, email, program)
+            else:
+                student.name, student.email, student.program = name, email, program
+            gone.discard(student_id)
+            self.fresh.add(student_id)
+        for student_id in gone:
+            self.students.pop(student_id, None)
+
+    def course(self, course_id):
+        self.sync()
+        return self.course_index().get(int(course_id))
+
+    def courses(self):
+        # Every Course, by id
+        self.sync()
+        return list(self.course_index().values())
+
+    def course_index(self):
+        if self.course_map is None:
+            self.course_map = {row[0]: Course(*row) for row in self.backend.list_courses()}
+        return self.course_map
+
+    def grades(self, student):
+        # The student's Grades in semester and course order
+        self.sync()
+        courses = self.course_index()
+        return [Grade(student, courses.get(course_id), semester, grade_point)
+                for semester, course_id, _, _, grade_point in self.backend.fetch_student_grades(student.student_id)]
+
+    def registrations(self, student):
+        self.sync()
+        courses = self.course_index()
+        return [Registration(student, courses.get(course_id), semester, registered_at)
+                for semester, course_id, _, _, registered_at in self.backend.fetch_registrations(student.student_id)]
+
+    # Writes go to the backend and then to the mapped instance, so every
+    # holder of it sees the change
+
+    def update_student(self, student_id, name, email):
+        self.backend.update_student(student_id, name, email)
+        student = self.students.get(int(student_id))
+        if student is not None:
+            student.name = name
+            student.email = email
+
+    def delete_student(self, student_id):
+        self.backend.delete_student(student_id)
+        self.students.pop(int(student_id), None)
+        self.fresh.discard(int(student_id))
+
+    def forget_courses(self):
+        # After any course write; the course list is loaded again on next use
+        self.course_map = None
+
+    def clear(self):
+        self.students.clear()
+        self.fresh.clear()
+        self.all_students_read = False
+        self.course_map = None
+        self.stamp = None
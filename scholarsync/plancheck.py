@@ -0,0 +1,93 @@
+"""EXPLAIN QUERY PLAN check over every registered query.
+
+The covering indexes for these lookups are created by migrate_base_schema.
+The plan check runs over the statements in scholarsync.queries and reports
+any query that falls back to a full scan, of its table or of a covering
+index, unless that read is listed in FULL_READS:
+
+    python -m scholarsync.plancheck [database]
+"""
+import re
+import sys
+
+# The modules the package does not import itself register their queries
+# when imported
+from . import export, roster, transcripts  # noqa: F401
+from .database import DEFAULT_DB_PATH, connect, has_student_search
+from .queries import QUERIES
+
+# Tables (or aliases) each query may legitimately read in full; every other
+# registered query must reach its rows through an index
+FULL_READS = {
+    "cgpa for all students": ("SemesterSummary",),
+    "student names": ("Student",),
+    "semester totals from grades": ("g",),
+    "semester summary rebuild": ("g",),
+    "transcript export": ("g",),
+    "graded student ids": ("Grade",),
+    "student list": ("Student",),
+    "grade status list": ("s",),
+    "registration status list": ("s",),
+    "grade sheet export": ("r",),
+    "cgpa summary export": ("ss",),
+    "course list": ("Course",),
+    "professor list": ("Professor",),
+    "student search without index": ("s",),
+    "student search installed": ("sqlite_master",),
+    "student search trigger": ("sqlite_master",),
+    # First pages read from the lowest key and stop at their LIMIT
+    "students first page": ("Student",),
+    "courses first page": ("c",),
+    "professors first page": ("Professor",),
+    "grade-status first page": ("s",),
+    "registration-status first page": ("s",),
+    "iterate students": ("Student",),
+    "iterate courses": ("Course",),
+    "iterate grades": ("Grade",),
+}
+
+# Only checked when the database has the FTS5 index
+STUDENT_SEARCH_QUERIES = ("student search", "index imported students", "rebuild student search")
+
+def query_plan_checks(db):
+    # (name, sql, full reads) for every registered query
+    search = has_student_search(db)
+    return [(name, sql, FULL_READS.get(name, ())) for name, sql in QUERIES.items()
+            if search or name not in STUDENT_SEARCH_QUERIES]
+
+def parameter_count(sql):
+    # ?NNN parameters can be used more than once
+    numbered = [int(number) for number in re.findall(r"\?(\d+)", sql)]
+    return max(numbered) if numbered else sql.count("?")
+
+def check_query_plans(db, checks=None):
+    # Returns (name, plan detail) for every step that scans a table or an
+    # index in full or has SQLite build a throwaway automatic index
+    failures = []
+    for name, sql, full_reads in checks if checks is not None else query_plan_checks(db):
+        params = (None,) * parameter_count(sql)
+        for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            detail = row[-1]
+            scan = re.match(r"SCAN (\S+)(.*)", detail)
+            if "AUTOMATIC" in detail:
+                failures.append((name, detail))
+            elif scan and scan.group(1) not in full_reads and scan.group(1) != "CONSTANT" \
+                    and "VIRTUAL TABLE" not in scan.group(2):
+                failures.append((name, detail))
+    return failures
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    db = connect(argv[0] if argv else DEFAULT_DB_PATH)
+    try:
+        checks = query_plan_checks(db)
+        failures = check_query_plans(db, checks)
+    finally:
+        db.close()
+    for name, detail in failures:
+        print(f"{name}: {detail}")
+    print(f"{len(checks) - len({name for name, _ in failures})}/{len(checks)} queries use indexes")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
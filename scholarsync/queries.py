@@ -0,0 +1,208 @@
+"""Named statements and per-query timing.
+
+Every statement the application runs is registered under a name by the
+module that owns it, where it is defined:
+
+    HAS_GRADES_SQL = register_query("grade exists", "SELECT 1 FROM Grade WHERE student_id = ? LIMIT 1")
+
+The registry sizes each connection's prepared-statement cache so that none
+of them is ever evicted and re-prepared, and gives plancheck its queries.
+
+Connections opened with timed=True (the GUI's and the server's) record, per
+statement, the calls, the total and p95 latency and the rows returned or
+changed. A call is timed from execute until its rows are used up or the
+cursor is dropped. query_timings.snapshot() reads the figures, the
+query_stats operation serves them to remote clients, and
+dump_query_stats() writes them as JSON. Statements missing from the
+registry are timed too, listed under their SQL.
+"""
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# name: sql, in registration order
+QUERIES = {}
+# sql: name
+QUERY_NAMES = {}
+
+# Statement cache slots beyond the registry, for migrations and for the
+# queries of modules imported after a connection was opened (the package
+# loads roster, export and transcripts lazily)
+STATEMENT_CACHE_HEADROOM = 32
+# Latest latencies kept per statement for its p95
+LATENCY_SAMPLES = 1000
+
+def register_query(name, sql):
+    # Names sql and returns it, so a module can register its constants in place
+    if QUERIES.get(name, sql) != sql:
+        raise ValueError(f"query name already registered: {name}")
+    if QUERY_NAMES.get(sql, name) != name:
+        raise ValueError(f"{name}: statement already registered as {QUERY_NAMES[sql]}")
+    QUERIES[name] = sql
+    QUERY_NAMES[sql] = name
+    return sql
+
+def statement_cache_size():
+    # cached_statements for sqlite3.connect: every registered query fits
+    return len(QUERIES) + STATEMENT_CACHE_HEADROOM
+
+
+class QueryTiming:
+    __slots__ = ("calls", "seconds", "rows", "samples")
+
+    def __init__(self, samples):
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=samples)
+
+
+class QueryTimings:
+    # Figures for every statement run on a timed connection in this process.
+    # Shared by all of them, so safe to record into from any thread.
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.samples = samples
+        self.entries = {}  # sql: QueryTiming
+        self.lock = threading.Lock()
+
+    def record(self, sql, seconds, rows):
+        with self.lock:
+            timing = self.entries.get(sql)
+            if timing is None:
+                timing = self.entries[sql] = QueryTiming(self.samples)
+            timing.calls += 1
+            timing.seconds += seconds
+            timing.rows += rows
+            timing.samples.append(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.entries.clear()
+
+    def snapshot(self):
+        # One dict per statement, slowest in total first. Registered queries
+        # that have not run yet are listed with zero calls; unregistered
+        # statements have name None.
+        with self.lock:
+            entries = [(sql, timing.calls, timing.seconds, timing.rows, sorted(timing.samples))
+                       for sql, timing in self.entries.items()]
+        ran = {entry[0] for entry in entries}
+        entries.extend((sql, 0, 0.0, 0, []) for sql in QUERIES.values() if sql not in ran)
+
+        stats = []
+        for sql, calls, seconds, rows, samples in entries:
+            p95 = samples[math.ceil(len(samples) * 0.95) - 1] if samples else 0.0
+            stats.append({
+                "name": QUERY_NAMES.get(sql), "sql": " ".join(sql.split()), "calls": calls,
+                "total_ms": round(seconds * 1000, 3),
+                "mean_ms": round(seconds * 1000 / calls, 3) if calls else 0.0,
+                "p95_ms": round(p95 * 1000, 3), "rows": rows,
+            })
+        stats.sort(key=lambda stat: (-stat["total_ms"], stat["name"] or stat["sql"]))
+        return stats
+
+
+query_timings = QueryTimings()
+
+def dump_query_stats(f, stats=None):
+    # Writes a snapshot (this process's, unless one is given) as JSON
+    json.dump({
+        "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "statement_cache_size": statement_cache_size(),
+        "queries": query_timings.snapshot() if stats is None else stats,
+    }, f, indent=2)
+    f.write("\n")
+
+
+class TimedCursor(sqlite3.Cursor):
+    sql = None  # The statement being timed, until it is recorded
+
+    def execute(self, sql, parameters=()):
+        self.finish()
+        self.sql, self.seconds, self.rows = sql, 0.0, 0
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.seconds += time.perf_counter() - start
+            if self.description is None:
+                # No rows to fetch; rowcount is the rows changed
+                self.rows = max(self.rowcount, 0)
+                self.finish()
+
+    def executemany(self, sql, seq_of_parameters):
+        self.finish()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            query_timings.record(sql, time.perf_counter() - start, max(self.rowcount, 0))
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self.seconds += time.perf_counter() - start
+        if row is None:
+            self.finish()
+        else:
+            self.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self.seconds += time.perf_counter() - start
+        self.rows += len(rows)
+        if not rows:
+            self.finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self.seconds += time.perf_counter() - start
+        self.rows += len(rows)
+        self.finish()
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self.seconds += time.perf_counter() - start
+            self.finish()
+            raise
+        self.seconds += time.perf_counter() - start
+        self.rows += 1
+        return row
+
+    def close(self):
+        self.finish()
+        super().close()
+
+    def finish(self):
+        if self.sql is not None:
+            query_timings.record(self.sql, self.seconds, self.rows)
+            self.sql = None
+
+    def __del__(self):
+        # Most cursors are dropped after one fetchone()
+        self.finish()
+
+
+class TimedConnection(sqlite3.Connection):
+    # sqlite3.connect(..., factory=TimedConnection): every statement run
+    # through execute, executemany or a cursor is timed
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,285 @@
+"""Student, course and professor records.
+
+Write functions commit on success and let sqlite3.IntegrityError (duplicate
+email, duplicate course name) propagate to the caller.
+
+Course and professor lookups used by the dialogs are served from the
+connection's reference_cache(db). Every write below drops exactly the
+entries it can change, and the whole cache is dropped as soon as another
+connection or process has committed (PRAGMA data_version), so cached
+reference data is never stale.
+"""
+import json
+import threading
+import weakref
+
+from .cache import LRUCache
+from .grades import GRADE_STATUS_SQL, STUDENT_NAMES_SQL
+from .queries import register_query
+from .registrations import REGISTRATION_STATUS_SQL
+from .transactions import write_transaction
+
+REFERENCE_CACHE_SIZE = 512
+DATA_VERSION_SQL = register_query("data version", "PRAGMA data_version")
+
+# connection: (LRUCache, data_version it was filled at). Keyed by connection
+# because the cache keys do not name the database.
+reference_caches = weakref.WeakKeyDictionary()
+reference_caches_lock = threading.Lock()
+
+def reference_cache(db):
+    # The connection's cache of reference data, emptied first if another
+    # connection has committed since it was filled. Connections that cannot
+    # hold one (plain sqlite3 connections) get an empty throwaway cache.
+    data_version = db.execute(DATA_VERSION_SQL).fetchone()[0]
+    with reference_caches_lock:
+        try:
+            cache, filled_at = reference_caches.get(db, (None, None))
+        except TypeError:
+            return LRUCache(maxsize=0)
+        if cache is None:
+            cache = LRUCache(maxsize=REFERENCE_CACHE_SIZE)
+        elif filled_at != data_version:
+            cache.clear()
+        reference_caches[db] = (cache, data_version)
+    return cache
+
+def change_stamp(db):
+    # Differs from the previous stamp of the same connection once anything
+    # has been committed since: by another connection (data_version) or by
+    # this one (total_changes). Stamps of two connections never compare equal.
+    return [id(db), db.execute(DATA_VERSION_SQL).fetchone()[0], db.total_changes]
+
+STUDENT_TREE_SQL = "SELECT student_id, name, email FROM Student {where}"
+COURSE_TREE_SQL = """
+    SELECT c.course_id, c.course_name, c.credits,
+           IFNULL(p.last_name || ', ' || p.first_name, 'Not Assigned') as professor_name
+    FROM Course c
+    LEFT JOIN CourseAssignment ca ON c.course_id = ca.course_id
+    LEFT JOIN Professor p ON ca.professor_id = p.professor_id
+    {where}
+    GROUP BY c.course_id
+"""
+PROFESSOR_TREE_SQL = "SELECT professor_id, first_name, last_name, department, email FROM Professor {where}"
+
+def page_sql(select_sql, key_column, comparison=None):
+    # Keyset page over select_sql: the first page, or the rows after (">") or
+    # before ("<") a key. Rows before a key come back in descending order.
+    if comparison is None:
+        return f"{select_sql.format(where='')} ORDER BY {key_column} ASC LIMIT ?"
+    order = "ASC" if comparison == ">" else "DESC"
+    where = f"WHERE {key_column} {comparison} ?"
+    return f"{select_sql.format(where=where)} ORDER BY {key_column} {order} LIMIT ?"
+
+# name: (select_sql, key column) of the trees the GUI pages through
+TREE_QUERIES = {
+    "students": (STUDENT_TREE_SQL, "student_id"),
+    "courses": (COURSE_TREE_SQL, "c.course_id"),
+    "professors": (PROFESSOR_TREE_SQL, "professor_id"),
+    "grade-status": (GRADE_STATUS_SQL, "s.student_id"),
+    "registration-status": (REGISTRATION_STATUS_SQL, "s.student_id"),
+}
+
+# Every page and row statement of every tree, e.g. "courses page after"
+for tree, (select_sql, key_column) in TREE_QUERIES.items():
+    register_query(f"{tree} first page", page_sql(select_sql, key_column))
+    register_query(f"{tree} page after", page_sql(select_sql, key_column, ">"))
+    register_query(f"{tree} page before", page_sql(select_sql, key_column, "<"))
+    register_query(f"{tree} row", select_sql.format(where=f"WHERE {key_column} = ?"))
+
+def fetch_tree_page(db, tree, after=None, before=None, limit=200):
+    # One keyset page of a tree in ascending key order: the first page, the
+    # rows after a key or the rows just before one
+    select_sql, key_column = TREE_QUERIES[tree]
+    if after is not None:
+        return db.execute(page_sql(select_sql, key_column, ">"), (after, limit)).fetchall()
+    if before is not None:
+        return db.execute(page_sql(select_sql, key_column, "<"), (before, limit)).fetchall()[::-1]
+    return db.execute(page_sql(select_sql, key_column), (limit,)).fetchall()
+
+def fetch_tree_row(db, tree, key):
+    # The tree row for one key, or None once it has been deleted
+    select_sql, key_column = TREE_QUERIES[tree]
+    return db.execute(select_sql.format(where=f"WHERE {key_column} = ?"), (key,)).fetchone()
+
+# -------------
+# Students
+# -------------
+
+INSERT_STUDENT_SQL = register_query("add student", "INSERT INTO Student (name, email) VALUES (?, ?)")
+UPDATE_STUDENT_SQL = register_query("update student", "UPDATE Student SET name=?, email=? WHERE student_id=?")
+DELETE_STUDENT_SQL = register_query("delete student", "DELETE FROM Student WHERE student_id=?")
+STUDENTS_BY_ID_SQL = register_query("students by id", """
+    SELECT student_id, name, email, program FROM Student
+    WHERE student_id IN (SELECT value FROM json_each(?))
+    ORDER BY student_id
+""")
+STUDENTS_SQL = register_query("student list", "SELECT student_id, name, email, program FROM Student ORDER BY student_id")
+
+def add_student(db, name, email):
+    with write_transaction(db):
+        return db.execute(INSERT_STUDENT_SQL, (name, email)).lastrowid
+
+def update_student(db, student_id, name, email):
+    with write_transaction(db):
+        db.execute(UPDATE_STUDENT_SQL, (name, email, student_id))
+
+def delete_student(db, student_id):
+    with write_transaction(db):
+        db.execute(DELETE_STUDENT_SQL, (student_id,))
+
+def list_student_names(db):
+    # (student_id, name) for every student
+    return db.execute(STUDENT_NAMES_SQL).fetchall()
+
+def list_students(db):
+    # (student_id, name, email, program) for every student, by id
+    return db.execute(STUDENTS_SQL).fetchall()
+
+def fetch_students(db, student_ids):
+    # (student_id, name, email, program) for each of the ids that exists.
+    # The ids are bound as one JSON array.
+    return db.execute(STUDENTS_BY_ID_SQL,
+                      (json.dumps([int(student_id) for student_id in student_ids]),)).fetchall()
+
+# -------------
+# Courses
+# -------------
+
+INSERT_COURSE_SQL = register_query("add course", "INSERT INTO Course (course_name, credits) VALUES (?, ?)")
+UPDATE_COURSE_SQL = register_query("update course", "UPDATE Course SET course_name=?, credits=? WHERE course_id=?")
+DELETE_COURSE_SQL = register_query("delete course", "DELETE FROM Course WHERE course_id=?")
+ASSIGN_PROFESSOR_SQL = register_query("assign professor",
+                                      "INSERT INTO CourseAssignment (course_id, professor_id) VALUES (?, ?)")
+DELETE_COURSE_ASSIGNMENTS_SQL = register_query("delete course assignments",
+                                               "DELETE FROM CourseAssignment WHERE course_id=?")
+DELETE_COURSE_GRADES_SQL = register_query("delete course grades", "DELETE FROM Grade WHERE course_id=?")
+DELETE_COURSE_REGISTRATIONS_SQL = register_query("delete course registrations",
+                                                 "DELETE FROM Registration WHERE course_id=?")
+COURSES_SQL = register_query("course list", "SELECT course_id, course_name, credits FROM Course")
+COURSE_NAME_SQL = register_query("course name", "SELECT course_name FROM Course WHERE course_id = ?")
+COURSE_PROFESSOR_SQL = register_query("course professor", """
+    SELECT p.professor_id, p.first_name || ' ' || p.last_name as full_name
+    FROM Professor p
+    JOIN CourseAssignment ca ON p.professor_id = ca.professor_id
+    WHERE ca.course_id = ?
+""")
+
+def add_course(db, course_name, credits, professor_id=None):
+    with write_transaction(db):
+        course_id = db.execute(INSERT_COURSE_SQL, (course_name, credits)).lastrowid
+        if professor_id:
+            db.execute(ASSIGN_PROFESSOR_SQL, (course_id, professor_id))
+    cache = reference_cache(db)
+    cache.invalidate_kind("courses")
+    cache.invalidate(("course_professor", course_id))
+    if professor_id:
+        cache.invalidate(("professor_courses", int(professor_id)))
+    return course_id
+
+def update_course(db, course_id, course_name, credits, professor_id=None):
+    # Also replaces the professor assignment (None leaves the course unassigned)
+    with write_transaction(db):
+        db.execute(UPDATE_COURSE_SQL, (course_name, credits, course_id))
+        db.execute(DELETE_COURSE_ASSIGNMENTS_SQL, (course_id,))
+        if professor_id:
+            db.execute(ASSIGN_PROFESSOR_SQL, (course_id, professor_id))
+    invalidate_course(db, course_id)
+
+def delete_course(db, course_id):
+    # Delete from CourseAssignment first due to foreign key constraints
+    with write_transaction(db):
+        db.execute(DELETE_COURSE_ASSIGNMENTS_SQL, (course_id,))
+        db.execute(DELETE_COURSE_SQL, (course_id,))
+    invalidate_course(db, course_id)
+
+def delete_course_with_records(db, course_id):
+    # delete_course for a course that has been graded or registered for:
+    # its grades, then its registrations, then the course, all or nothing
+    with write_transaction(db):
+        db.execute(DELETE_COURSE_GRADES_SQL, (course_id,))
+        db.execute(DELETE_COURSE_REGISTRATIONS_SQL, (course_id,))
+        db.execute(DELETE_COURSE_ASSIGNMENTS_SQL, (course_id,))
+        db.execute(DELETE_COURSE_SQL, (course_id,))
+    invalidate_course(db, course_id)
+
+def invalidate_course(db, course_id):
+    # The course's own entries, the course list, and the professor course
+    # lists (the course may have moved from one professor to another)
+    course_id = int(course_id)
+    cache = reference_cache(db)
+    cache.invalidate(("course_name", course_id), ("course_professor", course_id))
+    cache.invalidate_kind("courses", "professor_courses")
+
+def list_courses(db):
+    # (course_id, course_name, credits) for every course
+    return reference_cache(db).get(("courses",), lambda: tuple(db.execute(COURSES_SQL)))
+
+def course_name(db, course_id):
+    def load():
+        row = db.execute(COURSE_NAME_SQL, (course_id,)).fetchone()
+        return row[0] if row else None
+    return reference_cache(db).get(("course_name", int(course_id)), load)
+
+def course_professor(db, course_id):
+    # (professor_id, full_name) of the professor teaching a course, or None.
+    # Wrapped in a tuple so that "no professor" is cached too.
+    return reference_cache(db).get(("course_professor", int(course_id)), lambda: (
+        db.execute(COURSE_PROFESSOR_SQL, (course_id,)).fetchone(),))[0]
+
+# -------------
+# Professors
+# -------------
+
+INSERT_PROFESSOR_SQL = register_query(
+    "add professor", "INSERT INTO Professor (first_name, last_name, department, email) VALUES (?, ?, ?, ?)")
+UPDATE_PROFESSOR_SQL = register_query(
+    "update professor",
+    "UPDATE Professor SET first_name=?, last_name=?, department=?, email=? WHERE professor_id=?")
+DELETE_PROFESSOR_SQL = register_query("delete professor", "DELETE FROM Professor WHERE professor_id=?")
+DELETE_PROFESSOR_ASSIGNMENTS_SQL = register_query("delete professor assignments",
+                                                  "DELETE FROM CourseAssignment WHERE professor_id=?")
+PROFESSOR_COURSES_SQL = register_query("professor courses",
+                                       "SELECT course_id FROM CourseAssignment WHERE professor_id = ?")
+PROFESSORS_SQL = register_query("professor list", """
+    SELECT professor_id, first_name || ' ' || last_name as full_name
+    FROM Professor
+    ORDER BY last_name, first_name
+""")
+
+def add_professor(db, first_name, last_name, department, email):
+    with write_transaction(db):
+        professor_id = db.execute(INSERT_PROFESSOR_SQL, (first_name, last_name, department, email)).lastrowid
+    reference_cache(db).invalidate_kind("professors")
+    return professor_id
+
+def update_professor(db, professor_id, first_name, last_name, department, email):
+    with write_transaction(db):
+        db.execute(UPDATE_PROFESSOR_SQL, (first_name, last_name, department, email, professor_id))
+    # The new name shows up in the dropdowns and on the courses they teach
+    invalidate_professor(db, professor_courses(db, professor_id))
+
+def delete_professor(db, professor_id):
+    # Removes the professor and their course assignments; returns the ids of
+    # the courses that lost their professor
+    course_ids = professor_courses(db, professor_id)
+    with write_transaction(db):
+        db.execute(DELETE_PROFESSOR_ASSIGNMENTS_SQL, (professor_id,))
+        db.execute(DELETE_PROFESSOR_SQL, (professor_id,))
+    reference_cache(db).invalidate(("professor_courses", int(professor_id)))
+    invalidate_professor(db, course_ids)
+    return course_ids
+
+def invalidate_professor(db, course_ids):
+    cache = reference_cache(db)
+    cache.invalidate_kind("professors")
+    cache.invalidate(*[("course_professor", course_id) for course_id in course_ids])
+
+def professor_courses(db, professor_id):
+    # Ids of the courses a professor teaches
+    return reference_cache(db).get(("professor_courses", int(professor_id)), lambda: tuple(
+        row[0] for row in db.execute(PROFESSOR_COURSES_SQL, (professor_id,))))
+
+def list_professors(db):
+    # (professor_id, full_name) for the professor dropdowns
+    return reference_cache(db).get(("professors",), lambda: tuple(db.execute(PROFESSORS_SQL)))
@@ -0,0 +1,146 @@
+"""Course registrations and the legacy registration file import."""
+import glob
+import os
+from datetime import datetime
+
+from .grades import parse_semester
+from .queries import register_query
+from .transactions import write_transaction
+
+# Every student with whether any registration is stored
+REGISTRATION_STATUS_SQL = """
+    SELECT s.student_id, s.name,
+           EXISTS (SELECT 1 FROM Registration r WHERE r.student_id = s.student_id) AS registered
+    FROM Student s
+    {where}
+"""
+REGISTRATION_STATUS_LIST_SQL = register_query("registration status list", REGISTRATION_STATUS_SQL.format(where=""))
+
+STUDENT_REGISTRATIONS_SQL = register_query("registration report", """
+    SELECT r.semester, r.course_id, c.course_name, c.credits, r.registered_at
+    FROM Registration r
+    LEFT JOIN Course c ON r.course_id = c.course_id
+    WHERE r.student_id = ?
+    ORDER BY r.semester, r.course_id
+""")
+CLEAR_SEMESTER_REGISTRATION_SQL = register_query(
+    "replace registration", "DELETE FROM Registration WHERE student_id = ? AND semester = ?")
+INSERT_REGISTRATION_SQL = register_query("register course", """
+    INSERT INTO Registration (student_id, course_id, semester, registered_at)
+    VALUES (?, ?, ?, ?)
+""")
+
+def registration_status(db):
+    # (student_id, name, registered) for every student
+    return db.execute(REGISTRATION_STATUS_LIST_SQL).fetchall()
+
+def save_registration(db, student_id, semester, course_ids):
+    # Replace this semester's registration in one transaction
+    registered_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with write_transaction(db):
+        db.execute(CLEAR_SEMESTER_REGISTRATION_SQL, (student_id, semester))
+        db.executemany(INSERT_REGISTRATION_SQL,
+                       [(student_id, course_id, semester, registered_at) for course_id in course_ids])
+
+REGISTERED_COURSES_SQL = register_query("registered courses", """
+    SELECT r.course_id, c.course_name
+    FROM Registration r
+    JOIN Course c ON r.course_id = c.course_id
+    WHERE r.student_id = ? AND r.semester = ?
+    ORDER BY r.course_id
+""")
+LATEST_SEMESTER_SQL = register_query("latest registered semester",
+                                     "SELECT MAX(semester) FROM Registration WHERE student_id = ?")
+COURSE_SEMESTERS_SQL = register_query(
+    "course semesters", "SELECT DISTINCT semester FROM Registration WHERE course_id = ? ORDER BY semester")
+HAS_REGISTRATION_SQL = register_query("registration exists",
+                                      "SELECT 1 FROM Registration WHERE student_id = ? LIMIT 1")
+DELETE_REGISTRATIONS_SQL = register_query("delete student registrations",
+                                          "DELETE FROM Registration WHERE student_id = ?")
+
+def latest_registration(db, student_id):
+    # (semester, [(course_id, course_name), ...]) of the latest registered
+    # semester, or (None, []). Course names come with the ids in one query.
+    semester = db.execute(LATEST_SEMESTER_SQL, (student_id,)).fetchone()[0]
+    if semester is None:
+        return None, []
+    return semester, db.execute(REGISTERED_COURSES_SQL, (student_id, semester)).fetchall()
+
+def course_semesters(db, course_id):
+    # Semesters in which anyone registered for a course, oldest first
+    rows = db.execute(COURSE_SEMESTERS_SQL, (course_id,))
+    return [row[0] for row in rows]
+
+def fetch_registrations(db, student_id):
+    # (semester, course_id, course_name, credits, registered_at) for one student
+    return db.execute(STUDENT_REGISTRATIONS_SQL, (student_id,)).fetchall()
+
+def has_registration(db, student_id):
+    return db.execute(HAS_REGISTRATION_SQL, (student_id,)).fetchone() is not None
+
+def delete_registration(db, student_id):
+    with write_transaction(db):
+        db.execute(DELETE_REGISTRATIONS_SQL, (student_id,))
+
+# -----------------------------
+# Registration file migration
+# -----------------------------
+# Registrations used to be written to one registration_{student_id}.txt per
+# student. Any such files are imported into the Registration table once and
+# renamed to *.migrated so later startups skip them.
+
+def parse_registration_file(path):
+    # Yields (student_id, course_id, semester, registered_at) rows from a legacy file
+    student_id = None
+    semester = 1
+    course_ids = []
+    registered_at = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("Student ID:"):
+                student_id = int(line.split(":", 1)[1].strip())
+            elif line.startswith("Semester:"):
+                semester = parse_semester(line.split(":", 1)[1])
+            elif line.startswith("Registration Date:"):
+                registered_at = line.split(":", 1)[1].strip()
+            elif line.startswith("- "):
+                # Course lines look like "- 101 - Introduction to Programming (3 credits)"
+                try:
+                    course_ids.append(int(line.strip("- \n").split(" - ")[0]))
+                except (ValueError, IndexError):
+                    continue
+    if student_id is None:
+        return
+    for course_id in course_ids:
+        yield (student_id, course_id, semester, registered_at)
+
+IMPORT_REGISTRATION_SQL = register_query("import registration file", """
+    INSERT OR IGNORE INTO Registration (student_id, course_id, semester, registered_at)
+    SELECT ?1, ?2, ?3, ?4
+    WHERE EXISTS (SELECT 1 FROM Student WHERE student_id = ?1)
+      AND EXISTS (SELECT 1 FROM Course WHERE course_id = ?2)
+""")
+
+def migrate_registration_files(db, directory="."):
+    paths = sorted(glob.glob(os.path.join(directory, "registration_*.txt")))
+    if not paths:
+        return 0
+
+    rows = []
+    migrated = []
+    for path in paths:
+        try:
+            rows.extend(parse_registration_file(path))
+        except (OSError, ValueError):
+            # Leave unreadable files in place so they can be fixed by hand
+            continue
+        migrated.append(path)
+
+    # One transaction for the whole import; re-running it is harmless. Rows
+    # for students or courses that no longer exist are dropped (foreign keys).
+    with write_transaction(db):
+        db.executemany(IMPORT_REGISTRATION_SQL, rows)
+
+    for path in migrated:
+        os.replace(path, path + ".migrated")
+    return len(rows)
@@ -0,0 +1,44 @@
+"""Plain-text grade and registration reports."""
+from .grades import GRADE_LETTERS, compute_cgpa
+
+def format_grades(db, student_id, student_name, grades):
+    # Grade report text, one block per semester with its SGPA and the overall CGPA
+    result = compute_cgpa(db, student_id)
+    sgpas = {semester.semester: semester.sgpa for semester in result.semesters} if result else {}
+
+    lines = [f"Student ID: {student_id}", f"Student Name: {student_name}"]
+    current_semester = None
+    for semester, course_id, course_name, credits, grade_point in grades:
+        if semester != current_semester:
+            if current_semester in sgpas:
+                lines.append(f"Semester SGPA: {sgpas[current_semester]:.2f}")
+            lines.append("")
+            lines.append(f"Semester: {semester}")
+            lines.append("Course Grades:")
+            current_semester = semester
+        letter_grade = GRADE_LETTERS.get(grade_point, "--")
+        lines.append(f"- {course_id} - {course_name}: {letter_grade} ({grade_point})")
+    if current_semester in sgpas:
+        lines.append(f"Semester SGPA: {sgpas[current_semester]:.2f}")
+    if result:
+        lines.append("")
+        lines.append(f"CGPA: {result.cgpa:.2f}")
+        lines.append(f"Total Credits: {result.total_credits}")
+    return "\n".join(lines) + "\n"
+
+def format_registration(student_id, student_name, registrations):
+    # Same layout the old registration_{id}.txt files used, one block per semester
+    lines = [f"Student ID: {student_id}", f"Student Name: {student_name}"]
+    current_semester = None
+    registered_at = None
+    for semester, course_id, course_name, credits, row_registered_at in registrations:
+        if semester != current_semester:
+            if current_semester is not None:
+                lines.append(f"Registration Date: {registered_at}")
+            lines.append(f"Semester: {semester}")
+            lines.append("Registered Courses:")
+            current_semester = semester
+        lines.append(f"- {course_id} - {course_name} ({credits} credits)")
+        registered_at = row_registered_at
+    lines.append(f"Registration Date: {registered_at}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,200 @@
+"""Bulk roster import from CSV.
+
+Rows are streamed from the file, validated and inserted in chunks with
+executemany, all inside one transaction. Each chunk runs in a savepoint; if a
+chunk hits an IntegrityError (a duplicate email or course name) it is rolled
+back to the savepoint and retried row by row, so the offending rows are
+reported and every other row is still imported.
+
+The per-row student search trigger is dropped for the length of a student
+import and put back before the commit; other connections never see it
+missing. The new students are indexed once the rows are committed, in one
+statement and a transaction of its own, so the write lock is not held across
+both; until then searches do not find them. If another client wrote in
+between, the whole index is rebuilt instead, since an edit to a student not
+yet indexed leaves it inconsistent.
+
+    python -m scholarsync.roster students intake.csv [--db student_grades.db]
+"""
+import argparse
+import csv
+import sqlite3
+import sys
+from typing import List, NamedTuple, Tuple
+
+from .database import DEFAULT_DB_PATH, PROFILES, connect
+from .queries import register_query
+from .records import (
+    DATA_VERSION_SQL, INSERT_COURSE_SQL, INSERT_PROFESSOR_SQL, INSERT_STUDENT_SQL, reference_cache,
+)
+from .transactions import begin_immediate, write_transaction
+
+CHUNK_SIZE = 5000
+
+# kind: (table, CSV columns in insert order)
+ROSTER_KINDS = {
+    "students": ("Student", ("name", "email")),
+    "courses": ("Course", ("course_name", "credits")),
+    "professors": ("Professor", ("first_name", "last_name", "department", "email")),
+}
+# The records' own insert statements, which take ROSTER_KINDS' columns
+ROSTER_INSERT_SQL = {
+    "students": INSERT_STUDENT_SQL, "courses": INSERT_COURSE_SQL, "professors": INSERT_PROFESSOR_SQL,
+}
+
+SAVEPOINT_SQL = register_query("roster chunk savepoint", "SAVEPOINT roster_chunk")
+ROLLBACK_SAVEPOINT_SQL = register_query("roster chunk rollback", "ROLLBACK TO roster_chunk")
+RELEASE_SAVEPOINT_SQL = register_query("roster chunk release", "RELEASE roster_chunk")
+LAST_STUDENT_ID_SQL = register_query("last student id", "SELECT IFNULL(MAX(student_id), 0) FROM Student")
+SEARCH_TRIGGER_SQL = register_query(
+    "student search trigger", "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'student_search_insert'")
+DROP_SEARCH_TRIGGER_SQL = register_query("drop student search trigger", "DROP TRIGGER student_search_insert")
+INDEX_NEW_STUDENTS_SQL = register_query("index imported students", """
+    INSERT INTO StudentSearch (rowid, name, email)
+    SELECT student_id, name, email FROM Student WHERE student_id > ?
+""")
+REBUILD_SEARCH_SQL = register_query("rebuild student search",
+                                    "INSERT INTO StudentSearch (StudentSearch) VALUES ('rebuild')")
+
+
+class RosterResult(NamedTuple):
+    inserted: int
+    errors: List[Tuple[int, str]]  # (CSV line number, message)
+
+
+def validate_row(kind, values):
+    # Returns the insert parameters for one row, or raises ValueError
+    if not all(values):
+        raise ValueError("missing value")
+    if kind == "courses":
+        try:
+            credits = int(values[1])
+        except ValueError:
+            raise ValueError("credits must be a number") from None
+        if credits <= 0:
+            raise ValueError("credits must be positive")
+        return (values[0], credits)
+    return tuple(values)
+
+def insert_chunk(db, sql, chunk, errors):
+    # chunk: [(line_number, params)]. Returns the number of rows inserted.
+    db.execute(SAVEPOINT_SQL)
+    try:
+        db.executemany(sql, [params for _, params in chunk])
+    except sqlite3.IntegrityError:
+        db.execute(ROLLBACK_SAVEPOINT_SQL)
+    else:
+        db.execute(RELEASE_SAVEPOINT_SQL)
+        return len(chunk)
+
+    # Retry the failed chunk one row at a time to find the duplicates
+    inserted = 0
+    for line_number, params in chunk:
+        try:
+            db.execute(sql, params)
+        except sqlite3.IntegrityError as e:
+            errors.append((line_number, str(e)))
+        else:
+            inserted += 1
+    db.execute(RELEASE_SAVEPOINT_SQL)
+    return inserted
+
+def suspend_search_trigger(db):
+    # Drops the StudentSearch insert trigger inside the current transaction
+    # and returns its CREATE statement, or None when search is not installed
+    row = db.execute(SEARCH_TRIGGER_SQL).fetchone()
+    if row is None:
+        return None
+    db.execute(DROP_SEARCH_TRIGGER_SQL)
+    return row[0]
+
+def index_imported_students(db, after_id, data_version):
+    # Indexes the students added after after_id, the import having committed
+    # at data_version
+    with write_transaction(db):
+        if db.execute(DATA_VERSION_SQL).fetchone()[0] == data_version:
+            db.execute(INDEX_NEW_STUDENTS_SQL, (after_id,))
+        else:
+            db.execute(REBUILD_SEARCH_SQL)
+
+def import_roster(db, path, kind, chunk_size=CHUNK_SIZE):
+    # Imports a CSV with a header row naming the columns of ROSTER_KINDS[kind]
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return import_roster_file(db, f, kind, chunk_size, name=path)
+
+def import_roster_file(db, f, kind, chunk_size=CHUNK_SIZE, name="roster"):
+    # The same import from an open text file (or any iterable of CSV lines)
+    table, columns = ROSTER_KINDS[kind]
+    sql = ROSTER_INSERT_SQL[kind]
+
+    errors = []
+    inserted = 0
+    reader = csv.reader(f)
+    header = [column.strip().lower() for column in next(reader, [])]
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError(f"{name}: missing column(s) {', '.join(missing)}")
+    positions = [header.index(column) for column in columns]
+
+    begin_immediate(db)
+    try:
+        trigger_sql = None
+        if table == "Student":
+            # AUTOINCREMENT keys, so every imported student is above this
+            last_id = db.execute(LAST_STUDENT_ID_SQL).fetchone()[0]
+            trigger_sql = suspend_search_trigger(db)
+
+        chunk = []
+        for row in reader:
+            if not any(row):
+                continue  # Blank line
+            try:
+                values = [row[i].strip() if i < len(row) else "" for i in positions]
+                chunk.append((reader.line_num, validate_row(kind, values)))
+            except ValueError as e:
+                errors.append((reader.line_num, str(e)))
+                continue
+            if len(chunk) >= chunk_size:
+                inserted += insert_chunk(db, sql, chunk, errors)
+                chunk = []
+        if chunk:
+            inserted += insert_chunk(db, sql, chunk, errors)
+        if trigger_sql is not None:
+            db.execute(trigger_sql)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    if trigger_sql is not None:
+        index_imported_students(db, last_id, db.execute(DATA_VERSION_SQL).fetchone()[0])
+
+    # New rows appear in the cached course and professor lists
+    reference_cache(db).invalidate_kind("courses", "professors")
+    errors.sort()
+    return RosterResult(inserted, errors)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scholarsync.roster",
+                                     description="Import a roster CSV in one transaction.")
+    parser.add_argument("kind", choices=sorted(ROSTER_KINDS))
+    parser.add_argument("csv_path")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="bulk-load",
+                        help="connection profile (default: bulk-load)")
+    args = parser.parse_args(argv)
+
+    db = connect(args.db, args.profile)
+    try:
+        result = import_roster(db, args.csv_path, args.kind)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+    for line_number, message in result.errors:
+        print(f"line {line_number}: {message}", file=sys.stderr)
+    print(f"{result.inserted} {args.kind} imported, {len(result.errors)} rejected")
+    return 1 if result.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Student search.
+
+Search-as-you-type over student name, email and ID. Every word typed is a
+prefix term, and all of them must match. Matches come back in ID order so
+even very common terms stop scanning at the limit. Results carry the grade
+status so they can go straight into the Grade Entry tree.
+"""
+import re
+
+from .database import has_student_search
+from .queries import register_query
+
+SEARCH_LIMIT = 200
+
+STUDENT_BY_ID_SQL = register_query("student search by id", """
+    SELECT s.student_id, s.name,
+           EXISTS (SELECT 1 FROM Grade g WHERE g.student_id = s.student_id)
+    FROM Student s
+    WHERE s.student_id = ?
+""")
+STUDENT_SEARCH_SQL = register_query("student search", """
+    SELECT s.student_id, s.name,
+           EXISTS (SELECT 1 FROM Grade g WHERE g.student_id = s.student_id)
+    FROM StudentSearch
+    JOIN Student s ON s.student_id = StudentSearch.rowid
+    WHERE StudentSearch MATCH ?
+    ORDER BY StudentSearch.rowid
+    LIMIT ?
+""")
+# Without FTS5
+STUDENT_LIKE_SQL = register_query("student search without index", """
+    SELECT s.student_id, s.name,
+           EXISTS (SELECT 1 FROM Grade g WHERE g.student_id = s.student_id)
+    FROM Student s
+    WHERE s.name LIKE ? OR s.email LIKE ?
+    LIMIT ?
+""")
+
+def search_students_by_text(db, text, limit=SEARCH_LIMIT):
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return []
+
+    rows = []
+    if text.strip().isdigit():
+        # Exact ID match first
+        rows = db.execute(STUDENT_BY_ID_SQL, (int(text.strip()),)).fetchall()
+
+    if has_student_search(db):
+        match = " ".join(f'"{term}"*' for term in terms)
+        matches = db.execute(STUDENT_SEARCH_SQL, (match, limit)).fetchall()
+    else:
+        pattern = f"%{text.strip()}%"
+        matches = db.execute(STUDENT_LIKE_SQL, (pattern, pattern, limit)).fetchall()
+
+    seen = {row[0] for row in rows}
+    rows.extend(row for row in matches if row[0] not in seen)
+    return rows[:limit]
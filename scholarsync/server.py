@@ -0,0 +1,224 @@
+"""ScholarSync server: one process owns the database and serves it over HTTP.
+
+Workstations run the GUI against the server (python main.py --server URL)
+instead of sharing the SQLite file over a network drive. Every operation in
+scholarsync.backend.OPERATIONS is exposed as JSON:
+
+    POST /api/<op>   {"args": [...]}                 -> {"result": ...}
+    POST /batch      {"calls": [[op, arg, ...], ...]} -> {"results": [{"result": ...} | {"error": ...}, ...]}
+    GET  /health                                      -> {"status": "ok", "schema_version": 6}
+
+A batch runs its calls in order on one pooled connection and answers them in
+one response; each call still commits on its own. Failed calls answer with
+{"error": message, "type": exception class name} and, outside a batch, an
+HTTP 400 (bad arguments), 404 (unknown operation), 409 (constraint) or 500.
+
+Requests are handled on a thread each, with connections lent from a fixed
+pool. The pooled connections are timed, so a client's query_stats call
+reports the server's per-query figures (see scholarsync.queries).
+
+There is no TLS; when --token is set every request must carry it as
+"Authorization: Bearer <token>". Binds to localhost unless told otherwise:
+
+    python -m scholarsync.server [--db student_grades.db] [--port 8765] [--pool 4]
+"""
+import argparse
+import hmac
+import json
+import os
+import queue
+import sqlite3
+import sys
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .backend import OPERATIONS
+from .database import (
+    DEFAULT_DB_PATH, DEFAULT_PROFILE, PROFILES, SCHEMA_VERSION_SQL, configure, connect, connection_options,
+)
+from .transactions import BUSY_TIMEOUT
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+POOL_SIZE = 4
+# Largest request body accepted (roster uploads are sent as CSV text)
+MAX_BODY = 64 * 1024 * 1024
+
+
+class ConnectionPool:
+    # A fixed set of connections shared by the request threads. A request
+    # waits for a free one rather than opening its own.
+    def __init__(self, path=DEFAULT_DB_PATH, profile=DEFAULT_PROFILE, size=POOL_SIZE):
+        # The first connection brings the schema up to date for all of them
+        first = connect(path, profile)
+        first.close()
+        self.connections = queue.LifoQueue()
+        for _ in range(size):
+            db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                                 **connection_options(timed=True))
+            self.connections.put(configure(db, profile))
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        db = self.connections.get()
+        try:
+            yield db
+        finally:
+            if db.in_transaction:
+                db.rollback()
+            self.connections.put(db)
+
+    def close(self):
+        for _ in range(self.size):
+            self.connections.get().close()
+
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def error_status(error):
+    if isinstance(error, APIError):
+        return error.status
+    if isinstance(error, sqlite3.IntegrityError):
+        return 409
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return 400
+    return 500
+
+def error_body(error):
+    return {"error": str(error), "type": type(error).__name__}
+
+def run_operation(db, op, args):
+    if op not in OPERATIONS:
+        raise APIError(404, f"unknown operation: {op}")
+    if not isinstance(args, list):
+        raise APIError(400, "args must be a list")
+    return OPERATIONS[op](db, *args)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client reuses one TCP connection for all its requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # waits on the client's delayed ACK (about 40 ms per request)
+    disable_nagle_algorithm = True
+    server_version = "ScholarSync"
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        if self.path != "/health":
+            self.send_json(404, {"error": f"not found: {self.path}", "type": "APIError"})
+            return
+        with self.server.pool.connection() as db:
+            version = db.execute(SCHEMA_VERSION_SQL).fetchone()[0]
+        self.send_json(200, {"status": "ok", "schema_version": version})
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        try:
+            body = self.read_json()
+            if self.path == "/batch":
+                self.send_json(200, {"results": self.run_batch(body.get("calls", []))})
+            elif self.path.startswith("/api/"):
+                with self.server.pool.connection() as db:
+                    result = run_operation(db, self.path[len("/api/"):], body.get("args", []))
+                self.send_json(200, {"result": result})
+            else:
+                raise APIError(404, f"not found: {self.path}")
+        except (APIError, sqlite3.Error, ValueError, TypeError, KeyError, OSError) as e:
+            self.send_json(error_status(e), error_body(e))
+
+    def run_batch(self, calls):
+        if not isinstance(calls, list):
+            raise APIError(400, "calls must be a list")
+        results = []
+        with self.server.pool.connection() as db:
+            for call in calls:
+                try:
+                    if not isinstance(call, list) or not call:
+                        raise APIError(400, "each call must be [op, arg, ...]")
+                    results.append({"result": run_operation(db, call[0], call[1:])})
+                except (APIError, sqlite3.Error, ValueError, TypeError, KeyError, OSError) as e:
+                    results.append(error_body(e))
+        return results
+
+    def authorized(self):
+        token = self.server.token
+        if token is None or hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+            return True
+        self.send_json(401, {"error": "missing or wrong token", "type": "APIError"})
+        return False
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True  # The unread body cannot be skipped
+            raise APIError(413, "request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise APIError(400, "request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise APIError(400, "request body must be a JSON object")
+        return body
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ScholarSyncServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pool, token=None, verbose=False):
+        super().__init__(address, RequestHandler)
+        self.pool = pool
+        self.token = token
+        self.verbose = verbose
+
+def serve(path=DEFAULT_DB_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT, profile=DEFAULT_PROFILE,
+          pool_size=POOL_SIZE, token=None, verbose=False):
+    # Returns the server; call serve_forever() on it (port 0 picks a free port)
+    return ScholarSyncServer((host, port), ConnectionPool(path, profile, pool_size), token, verbose)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scholarsync.server",
+                                     description="Serve a ScholarSync database over HTTP/JSON.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--pool", type=int, default=POOL_SIZE, help="pooled connections (default: 4)")
+    parser.add_argument("--token", default=os.environ.get("SCHOLARSYNC_TOKEN"),
+                        help="require this bearer token (default: $SCHOLARSYNC_TOKEN)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = serve(args.db, args.host, args.port, args.profile, args.pool, args.token, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving {args.db} on http://{host}:{port}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
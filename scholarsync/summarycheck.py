@@ -0,0 +1,129 @@
+"""Randomized check that the SemesterSummary triggers agree with a rebuild.
+
+Runs a random mix of grade and course writes on a scratch database. After
+every one it compares SemesterSummary, which the triggers of
+migrate_semester_summary keep current, with the totals computed from Grade
+itself (GRADE_TOTALS_SQL, what rebuild_semester_summary would write):
+
+    python -m scholarsync.summarycheck [--operations 3000] [--seed 1]
+
+Exits 1 at the first difference, naming the operation that caused it.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+from .database import connect
+from .grades import GRADE_TOTALS_SQL, delete_grades, save_grade_batch
+from .records import add_course, add_student, course_name, delete_course_with_records, update_course
+from .transactions import write_transaction
+
+STUDENTS = 30
+COURSES = 12
+SEMESTERS = 4
+GRADE_POINTS = (10.0, 9.0, 8.0, 7.0, 6.0, 5.0, 4.0, 0.0)
+# Points may be summed in a different order by the triggers and the rebuild
+TOLERANCE = 1e-6
+
+SUMMARY_SQL = "SELECT student_id, semester, weighted_points, credits FROM SemesterSummary"
+RANDOM_GRADE_SQL = "SELECT grade_id FROM Grade ORDER BY random() LIMIT 1"
+
+
+def totals(db, sql):
+    return {(student_id, semester): (weighted_points, credits)
+            for student_id, semester, weighted_points, credits in db.execute(sql)}
+
+def differences(db):
+    # (key, summary row, rebuilt row) wherever the two disagree
+    summary, rebuilt = totals(db, SUMMARY_SQL), totals(db, GRADE_TOTALS_SQL)
+    found = []
+    for key in sorted(summary.keys() | rebuilt.keys()):
+        have, want = summary.get(key), rebuilt.get(key)
+        if have is None or want is None or have[1] != want[1] or abs(have[0] - want[0]) > TOLERANCE:
+            found.append((key, have, want))
+    return found
+
+def random_grade(db):
+    row = db.execute(RANDOM_GRADE_SQL).fetchone()
+    return row[0] if row else None
+
+def run_operation(db, rnd, students, courses):
+    # Applies one random write and returns its description
+    kind = rnd.choices(["save", "delete", "move", "credits", "delete student", "delete course"],
+                       weights=[40, 15, 20, 10, 5, 3])[0]
+    if kind == "save":
+        # Inserts, and upserts over grades already entered
+        rows = [(rnd.choice(students), rnd.choice(courses), rnd.randint(1, SEMESTERS), rnd.choice(GRADE_POINTS))
+                for _ in range(rnd.randint(1, 5))]
+        save_grade_batch(db, rows)
+        return f"save grades {rows}"
+    if kind == "delete":
+        grade_id = random_grade(db)
+        with write_transaction(db):
+            db.execute("DELETE FROM Grade WHERE grade_id = ?", (grade_id,))
+        return f"delete grade {grade_id}"
+    if kind == "move":
+        # To another student, course or semester; a move onto a grade that
+        # already exists is refused by the unique index and changes nothing
+        grade_id = random_grade(db)
+        column, value = rnd.choice([("student_id", rnd.choice(students)), ("course_id", rnd.choice(courses)),
+                                    ("semester", rnd.randint(1, SEMESTERS))])
+        try:
+            with write_transaction(db):
+                db.execute(f"UPDATE Grade SET {column} = ? WHERE grade_id = ?", (value, grade_id))
+        except sqlite3.IntegrityError:
+            return f"move grade {grade_id} ({column} = {value}, refused)"
+        return f"move grade {grade_id} ({column} = {value})"
+    if kind == "credits":
+        course_id, credits = rnd.choice(courses), rnd.randint(1, 5)
+        update_course(db, course_id, course_name(db, course_id), credits)
+        return f"credits of course {course_id} = {credits}"
+    if kind == "delete student":
+        student_id = rnd.choice(students)
+        delete_grades(db, student_id)
+        return f"delete grades of student {student_id}"
+    course_id = rnd.choice(courses)
+    delete_course_with_records(db, course_id)
+    courses[courses.index(course_id)] = add_course(db, f"Course {rnd.getrandbits(32):08x}", rnd.randint(1, 5))
+    return f"delete course {course_id}"
+
+def check_summary(operations, seed):
+    # Returns None, or (operation number, description, differences) at the
+    # first operation after which the summary disagrees with a rebuild
+    rnd = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db = connect(os.path.join(directory, "summarycheck.db"))
+        try:
+            students = [add_student(db, f"Student {i}", f"student{i}@university.edu") for i in range(STUDENTS)]
+            courses = [add_course(db, f"Course {i}", rnd.randint(1, 5)) for i in range(COURSES)]
+            for number in range(1, operations + 1):
+                description = run_operation(db, rnd, students, courses)
+                found = differences(db)
+                if found:
+                    return number, description, found
+        finally:
+            db.close()
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scholarsync.summarycheck",
+                                     description="Check the SemesterSummary triggers against a rebuild.")
+    parser.add_argument("--operations", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    failure = check_summary(args.operations, args.seed)
+    if failure is None:
+        print(f"{args.operations} operations: SemesterSummary matches a rebuild")
+        return 0
+    number, description, found = failure
+    print(f"operation {number} ({description}) left SemesterSummary wrong:")
+    for (student_id, semester), have, want in found:
+        print(f"  student {student_id}, semester {semester}: summary {have}, rebuilt {want}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Short write transactions that are safe with several concurrent writers.
+
+Every write goes through write_transaction(), which starts with BEGIN
+IMMEDIATE. The write lock is taken before anything is read, so a
+transaction can never fail half way through because another client wrote
+first (a deferred transaction that reads, then writes, gets SQLITE_BUSY
+without waiting). While another client holds the lock, SQLite's busy
+timeout waits for it. If the lock is still held when the timeout runs out,
+BEGIN is retried with jittered exponential backoff before the error is
+raised. That can take about a minute, which suits background work but not a
+connection whose writes run on a UI thread; interactive() cuts its budget to
+about a second.
+"""
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from .queries import register_query
+
+# Seconds SQLite itself waits for a lock before reporting SQLITE_BUSY
+BUSY_TIMEOUT = 10.0
+# Further attempts at BEGIN IMMEDIATE after the busy timeout ran out
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.05
+# The same for interactive() connections
+INTERACTIVE_BUSY_TIMEOUT = 0.5
+INTERACTIVE_BUSY_RETRIES = 1
+
+# Its timing includes the busy timeout spent waiting for the write lock
+BEGIN_IMMEDIATE_SQL = register_query("begin immediate", "BEGIN IMMEDIATE")
+INTERACTIVE_BUSY_TIMEOUT_SQL = register_query(
+    "interactive busy timeout", f"PRAGMA busy_timeout = {int(INTERACTIVE_BUSY_TIMEOUT * 1000)}")
+
+def is_busy(error):
+    # SQLITE_BUSY (5) or SQLITE_LOCKED (6), including extended codes
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xff in (5, 6)
+    return "locked" in str(error) or "busy" in str(error)
+
+def interactive(db):
+    # Gives up on a held write lock after INTERACTIVE_BUSY_TIMEOUT and
+    # INTERACTIVE_BUSY_RETRIES, so a caller on a UI thread gets the busy error
+    # instead of freezing. Needs a connection that takes attributes (not a
+    # plain sqlite3.Connection).
+    db.execute(INTERACTIVE_BUSY_TIMEOUT_SQL)
+    db.busy_retries = INTERACTIVE_BUSY_RETRIES
+    return db
+
+def begin_immediate(db, retries=None):
+    if retries is None:
+        retries = getattr(db, "busy_retries", BUSY_RETRIES)
+    for attempt in range(retries + 1):
+        try:
+            db.execute(BEGIN_IMMEDIATE_SQL)
+            return
+        except sqlite3.OperationalError as e:
+            if not is_busy(e) or attempt == retries:
+                raise
+            delay = BUSY_BACKOFF * 2 ** attempt
+            time.sleep(delay + random.uniform(0, delay))
+
+@contextmanager
+def write_transaction(db):
+    # with write_transaction(db): ... commits on success, rolls back on error.
+    # Joins a transaction that is already open, as "with db:" did.
+    if not db.in_transaction:
+        begin_immediate(db)
+    try:
+        yield db
+    except BaseException:
+        db.rollback()
+        raise
+    db.commit()
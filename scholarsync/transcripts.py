@@ -0,0 +1,139 @@
+"""Bulk transcripts: one grade report file per graded student, in parallel.
+
+The graded students are cut into chunks of consecutive IDs and the chunks are
+fanned out over a process pool. Each worker opens its own read-only
+connection and writes the grades_{id}.txt report (every semester with its
+SGPA, then the CGPA) of each student in its ID range. A file is written under
+a temporary name and renamed into place, so a reader never sees half of one.
+
+    python -m scholarsync.transcripts OUTPUT_DIR [--db student_grades.db] [--workers 4] [--students 1-500]
+
+With --progress the job prints "written total" after every chunk, which is
+how the GUI follows a job it runs as a subprocess.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from .database import DEFAULT_DB_PATH, connect, connect_read_only
+from .export import parse_student_set
+from .grades import fetch_student_grades
+from .queries import register_query
+from .reports import format_grades
+
+CHUNK_SIZE = 250
+
+GRADED_STUDENTS_SQL = register_query("graded students in range", """
+    SELECT s.student_id, s.name
+    FROM Student s
+    WHERE s.student_id BETWEEN ? AND ?
+      AND EXISTS (SELECT 1 FROM Grade g WHERE g.student_id = s.student_id)
+    ORDER BY s.student_id
+""")
+GRADED_IDS_SQL = register_query("graded student ids", "SELECT DISTINCT student_id FROM Grade ORDER BY student_id")
+
+def transcript_path(directory, student_id):
+    return os.path.join(directory, f"grades_{student_id}.txt")
+
+def write_file_atomic(path, text):
+    # Write to a temporary file beside path, then rename it over path
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def plan_chunks(db, students=None, chunk_size=CHUNK_SIZE):
+    # (first_id, last_id, count, ids or None) per chunk of graded students.
+    # ids lists the students to write when only some of the range was asked
+    # for.
+    graded = [row[0] for row in db.execute(GRADED_IDS_SQL)]
+    if students is not None:
+        wanted = set(students)
+        graded = [student_id for student_id in graded if student_id in wanted]
+    chunks = []
+    for start in range(0, len(graded), chunk_size):
+        ids = graded[start:start + chunk_size]
+        chunks.append((ids[0], ids[-1], len(ids), ids if students is not None else None))
+    return chunks
+
+def write_transcript_range(db_path, directory, first_id, last_id, ids=None, exported_at=None):
+    # Worker: writes the transcripts of one chunk and returns how many
+    wanted = set(ids) if ids is not None else None
+    exported_at = exported_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    db = connect_read_only(db_path)
+    try:
+        written = 0
+        for student_id, name in db.execute(GRADED_STUDENTS_SQL, (first_id, last_id)).fetchall():
+            if wanted is not None and student_id not in wanted:
+                continue
+            content = format_grades(db, student_id, name, fetch_student_grades(db, student_id))
+            write_file_atomic(transcript_path(directory, student_id),
+                              content + f"Date Exported: {exported_at}\n")
+            written += 1
+        return written
+    finally:
+        db.close()
+
+def write_transcripts(db_path, directory, students=None, workers=None, chunk_size=CHUNK_SIZE,
+                      on_progress=None):
+    # Writes every graded student's transcript (or only those in students)
+    # into directory and returns the count. on_progress(written, total) is
+    # called as chunks finish, on this thread.
+    db = connect(db_path)
+    try:
+        chunks = plan_chunks(db, students, chunk_size)
+    finally:
+        db.close()
+    total = sum(chunk[2] for chunk in chunks)
+    os.makedirs(directory, exist_ok=True)
+
+    exported_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(write_transcript_range, db_path, directory, first_id, last_id, ids, exported_at)
+                   for first_id, last_id, _, ids in chunks]
+        for future in as_completed(futures):
+            written += future.result()
+            if on_progress is not None:
+                on_progress(written, total)
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scholarsync.transcripts",
+                                     description="Write a grade report file for every graded student.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--students", help="student ids and ranges, e.g. 1-500,731 (default: all)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--progress", action="store_true", help='print "written total" after every chunk')
+    args = parser.parse_args(argv)
+
+    try:
+        students = parse_student_set(args.students) if args.students else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    def report(written, total):
+        print(written, total, flush=True)
+
+    try:
+        written = write_transcripts(args.db, args.output_dir, students, args.workers, args.chunk_size,
+                                    report if args.progress else None)
+    except (OSError, sqlite3.Error) as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"{written} transcripts written to {args.output_dir}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
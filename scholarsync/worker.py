@@ -0,0 +1,50 @@
+"""Background database worker.
+
+Slow reads (CGPA, leaderboard, full-table status lists) run on a dedicated
+thread with its own connection so a UI thread never waits on SQLite. Jobs are
+called as fn(db, *args) and their results come back as Futures.
+"""
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+from .database import DEFAULT_PROFILE, configure, connection_options
+from .transactions import BUSY_TIMEOUT
+
+
+class DatabaseWorker:
+    def __init__(self, path, profile=DEFAULT_PROFILE, timed=False):
+        self.path = path
+        self.profile = profile
+        self.timed = timed
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="database-worker", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        db = configure(sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, **connection_options(self.timed)),
+                       self.profile)
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                future, fn, args = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(fn(db, *args))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            db.close()
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.put((future, fn, args))
+        return future
+
+    def stop(self):
+        self.jobs.put(None)
+        self.thread.join()